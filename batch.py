@@ -0,0 +1,165 @@
+"""This module solves many killer sudoku games at once with a pool of processes."""
+
+from typing import Iterable, Iterator, NamedTuple
+import multiprocessing
+import contextlib
+import argparse
+import json
+import io
+import time
+import sys
+import os
+
+from solver import SOLVERS
+from puzzle import Puzzle
+import serialization
+
+
+class BatchResult(NamedTuple):
+    """The outcome of solving one game of a batch.
+
+    Attributes
+    ----------
+    index: int
+        The position of the game in the batch.
+    status: str
+        One of 'solved', 'unsolvable' (invalid parameters or no solution), 'timeout' or 'error'.
+    solution: list[list[str]] | None
+        The solved board, if the game was solved.
+    error: str | None
+        The exception raised while solving, if any.
+    elapsed: float
+        The number of seconds spent on the game.
+    """
+    index: int
+    status: str
+    solution: list[list[str]] | None
+    error: str | None
+    elapsed: float
+
+
+def solve_one(job: tuple[int, tuple[list] | Puzzle, str, float | None]) -> BatchResult:
+    """Solves a single game of a batch. Exceptions are captured in the result.
+
+    Parameters
+    ----------
+    job: tuple[int, tuple[list] | Puzzle, str, float | None]
+        The index of the game, the game as a Puzzle or as the six arrays passed to 
+        KillerSudokuSolver.solve, the name of the solver in solver.SOLVERS and the timeout in seconds.
+
+    Returns
+    -------
+    result: BatchResult
+        The outcome of solving the game.
+    """
+    index, game, solver, timeout = job
+    start = time.perf_counter()
+    try:
+        # the arrays are copied so that the caller's game is left untouched when running in-process
+        game = game.to_tuple() if isinstance(game, Puzzle) else [[list(row) for row in array] for array in game]
+        # the backtracking solver prints why a game is invalid, which would mix into results written to stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            if timeout is None:
+                solution = SOLVERS[solver].solve(*game)
+            else:
+                solution = SOLVERS[solver].solve(*game, timeout=timeout)
+    except TimeoutError as e:
+        return BatchResult(index, 'timeout', None, str(e), time.perf_counter() - start)
+    except Exception as e:
+        return BatchResult(index, 'error', None, f'{type(e).__name__}: {e}', time.perf_counter() - start)
+    status = 'unsolvable' if solution is None else 'solved'
+    return BatchResult(index, status, solution, None, time.perf_counter() - start)
+
+
+def solve_many(
+        games: Iterable[tuple[list] | Puzzle],
+        workers: int | None = None,
+        chunksize: int = 1,
+        ordered: bool = True,
+        timeout: float | None = None,
+        solver: str = 'bitmask'
+        ) -> Iterator[BatchResult]:
+    """Solves many killer sudoku games, spreading them across a pool of processes.
+
+    Games are read from the iterable lazily and results are yielded as soon as they are available.
+
+    Parameters
+    ----------
+    games: Iterable[tuple[list] | Puzzle]
+        The games to solve, each given as a Puzzle or as the six arrays passed to KillerSudokuSolver.solve.
+        Puzzles are much cheaper to send to the processes.
+    workers: int | None
+        The number of processes. Defaults to the number of CPUs. With 1 or fewer, the games
+        are solved in the current process.
+    chunksize: int
+        The number of games sent to a process at a time.
+    ordered: bool
+        If True, results are yielded in the order of the games. Otherwise, they are yielded
+        in the order they are completed.
+    timeout: float | None
+        The number of seconds allowed for each game.
+    solver: str
+        The name of the solver in solver.SOLVERS. The 'backtracking' solver does not support timeouts.
+
+    Returns
+    -------
+    results: Iterator[BatchResult]
+        The outcome of solving each game.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f'unknown solver {solver!r}, expected one of {list(SOLVERS)}')
+    if timeout is not None and solver == 'backtracking':
+        raise ValueError('the backtracking solver does not support timeouts')
+
+    jobs = ((index, game, solver, timeout) for index, game in enumerate(games))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        yield from map(solve_one, jobs)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        if ordered:
+            yield from pool.imap(solve_one, jobs, chunksize)
+        else:
+            yield from pool.imap_unordered(solve_one, jobs, chunksize)
+
+
+# ========== command line interface ==========
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments of the solve subcommand to the parser."""
+    parser.add_argument('input', help='file with the games to solve, - for stdin')
+    parser.add_argument('-f', '--format', choices=['json', 'text', 'binary'], default='json', 
+                        help='format of the input: a JSON array of the six arrays per line, '
+                             'or the text or binary format of the serialization module')
+    parser.add_argument('-o', '--output', default='-', help='file to write one JSON result per line to, - for stdout')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of processes (default: number of CPUs)')
+    parser.add_argument('-c', '--chunksize', type=int, default=1, help='number of games sent to a process at a time')
+    parser.add_argument('-t', '--timeout', type=float, default=None, help='number of seconds allowed for each game')
+    parser.add_argument('-s', '--solver', choices=list(SOLVERS), default='bitmask', help='solver to use')
+    parser.add_argument('--unordered', action='store_true', help='write results in the order they are completed')
+
+
+def run(args: argparse.Namespace) -> int:
+    """Runs the solve subcommand. Returns the exit code."""
+    if args.input == '-':
+        source = sys.stdin.buffer if args.format == 'binary' else sys.stdin
+    else:
+        source = open(args.input, 'rb' if args.format == 'binary' else 'r')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        if args.format == 'text':
+            games = serialization.read_text(source)
+        elif args.format == 'binary':
+            games = serialization.read_binary(source)
+        else:
+            games = (json.loads(line) for line in source if line.strip())
+        results = solve_many(games, args.workers, args.chunksize, not args.unordered, args.timeout, args.solver)
+        for result in results:
+            target.write(json.dumps(result._asdict()) + '\n')
+    finally:
+        if args.input != '-':
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    return 0
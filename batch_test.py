@@ -0,0 +1,90 @@
+"""Usage: python -m pytest"""
+
+import pytest
+from batch import solve_many, solve_one
+from puzzle import Puzzle
+from solver import FastKillerSudokuSolver, DancingLinksSolver
+from solver_2_test import solution
+from solver_3_test import game
+
+
+def invalid() -> tuple[list]:
+    """Returns a game without a solution."""
+    data = game()
+    data[0][0][0] = '1'
+    return data
+
+# ========== solve_one() ==========
+def test_solve_one_1():
+    """Test description: solved game"""
+    result = solve_one((3, game(), 'bitmask', None))
+    assert (result.index, result.status, result.solution, result.error) == (3, 'solved', solution, None)
+
+def test_solve_one_2():
+    """Test description: game without a solution"""
+    result = solve_one((0, invalid(), 'dlx', 1.0))
+    assert (result.status, result.solution) == ('unsolvable', None)
+
+def test_solve_one_3():
+    """Test description: exception is captured"""
+    result = solve_one((0, game()[:5], 'bitmask', None))
+    assert result.status == 'error'
+    assert result.error.startswith('TypeError')
+
+def test_solve_one_4():
+    """Test description: game passed in is not modified"""
+    data = game()
+    solve_one((0, data, 'backtracking', None))
+    assert data == game()
+
+def test_solve_one_5(capsys):
+    """Test description: nothing is printed by the backtracking solver"""
+    data = game()
+    data[0][0][0] = data[0][0][3]
+    assert solve_one((0, data, 'backtracking', None)).status == 'unsolvable'
+    assert capsys.readouterr().out == ''
+
+# ========== solve_many() ==========
+def test_solve_many_1():
+    """Test description: results in the order of the games"""
+    results = list(solve_many([game(), invalid(), game()], workers=1))
+    assert [(x.index, x.status) for x in results] == [(0, 'solved'), (1, 'unsolvable'), (2, 'solved')]
+
+def test_solve_many_2():
+    """Test description: pool of processes"""
+    results = list(solve_many((game() for _ in range(6)), workers=2, chunksize=2, timeout=5))
+    assert [x.index for x in results] == list(range(6))
+    assert all(x.solution == solution for x in results)
+
+def test_solve_many_3():
+    """Test description: results in the order they are completed"""
+    results = list(solve_many([game(), invalid()] * 2, workers=2, ordered=False))
+    assert sorted(x.index for x in results) == [0, 1, 2, 3]
+
+def test_solve_many_4():
+    """Test description: unknown solver"""
+    with pytest.raises(ValueError):
+        list(solve_many([game()], solver='unknown'))
+
+def test_solve_many_5():
+    """Test description: backtracking solver cannot time out"""
+    with pytest.raises(ValueError):
+        list(solve_many([game()], timeout=1, solver='backtracking'))
+
+# ========== timeout ==========
+def test_timeout_1():
+    """Test description: search gives up after the timeout"""
+    data = list(game())
+    data[0] = [[''] * 9 for _ in range(9)]
+    with pytest.raises(TimeoutError):
+        FastKillerSudokuSolver.solve(*data, ordering='row-major', propagation=False, timeout=0)
+    assert data[0] == [[''] * 9 for _ in range(9)]
+
+def test_timeout_2():
+    """Test description: game solved within the timeout"""
+    assert DancingLinksSolver.solve(*game(), timeout=5) == solution
+
+def test_solve_many_6():
+    """Test description: games given as puzzles"""
+    results = list(solve_many([Puzzle.from_tuple(game())] * 2, workers=2))
+    assert [x.solution for x in results] == [solution, solution]
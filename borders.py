@@ -0,0 +1,150 @@
+"""This module repairs the borders of a board which do not describe a layout of groups."""
+
+import numpy as np
+from config import *
+
+
+def find(parent: list[int], x: int) -> int:
+    """Returns the root of x in a union-find forest, halving the path on the way."""
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+class BorderReconciler:
+    """Repairs the borders of a board so that they describe a layout of groups.
+
+    The borders found on the facing sides of two neighbouring boxes are two readings of the same 
+    edge, so their probabilities are combined into the probability that the edge is a border. 
+    The borders are consistent if the outer edges are borders, the borders are exactly the edges 
+    between different groups, and every group has one box with a sum which its size can reach.
+
+    If the borders are not consistent, the groups are grown again from the boxes with a sum. The
+    edges are opened from the most to the least likely to be open, unless the groups on either 
+    side both have a sum or the merged group would be too large for its sum. Edges at least cutoff
+    likely to be borders are never opened, so that a misread sum cannot merge groups across a clear
+    border. This is a greedy approximation of the most likely layout, and is only kept if it is 
+    consistent.
+    """
+    clip = 1e-6
+    cutoff = 0.8 # combined probability of an edge being a border from which it is never opened
+
+    @classmethod
+    def edges(cls, probabilities: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the probability of each edge between two boxes being a border, given the top, bottom, 
+        left and right probabilities of every box in an array of shape (9, 9, 4). The edges below 
+        each box have shape (8, 9) and the edges to the right of each box have shape (9, 8)."""
+        p = np.clip(probabilities, cls.clip, 1 - cls.clip)
+        combine = lambda a, b: a * b / (a * b + (1 - a) * (1 - b))
+        return combine(p[:-1, :, 1], p[1:, :, 0]), combine(p[:, :-1, 3], p[:, 1:, 2])
+
+    @staticmethod
+    def groups(below: np.ndarray, beside: np.ndarray) -> np.ndarray:
+        """Returns the group number of every box, given which edges below and to the right of each box are borders."""
+        size = below.shape[1]
+        parent = list(range(size * size))
+        for i, j in zip(*np.nonzero(~below)):
+            parent[find(parent, i * size + j)] = find(parent, (i + 1) * size + j)
+        for i, j in zip(*np.nonzero(~beside)):
+            parent[find(parent, i * size + j)] = find(parent, i * size + j + 1)
+        return np.array([find(parent, x) for x in range(size * size)]).reshape(size, size)
+
+    @staticmethod
+    def borders(groups: np.ndarray) -> np.ndarray:
+        """Returns the top, bottom, left and right borders of every box, in an array of shape (9, 9, 4),
+        with a border wherever the neighbouring box is in another group or outside the board."""
+        padded = np.pad(groups, 1, constant_values=-1)
+        return np.stack([padded[:-2, 1:-1] != groups, padded[2:, 1:-1] != groups,
+                         padded[1:-1, :-2] != groups, padded[1:-1, 2:] != groups], axis=-1)
+
+    @staticmethod
+    def feasible(size: int, total: int) -> bool:
+        """Returns whether a group of this size can have this sum."""
+        return size <= SUDOKU_SIZE and size * (size + 1) // 2 <= total <= sum(range(SUDOKU_SIZE - size + 1, SUDOKU_SIZE + 1))
+
+    @classmethod
+    def layout(cls, borders: np.ndarray) -> np.ndarray | None:
+        """Returns the group number of every box if the borders, of shape (9, 9, 4), are exactly the 
+        edges between groups and around the board, so that the sides of neighbouring boxes agree, 
+        and None otherwise."""
+        borders = np.asarray(borders, dtype=bool)
+        groups = cls.groups(borders[:-1, :, 1], borders[:, :-1, 3])
+        return groups if np.array_equal(cls.borders(groups), borders) else None
+
+    @classmethod
+    def consistent(cls, borders: np.ndarray, sums: np.ndarray) -> bool:
+        """Returns whether the borders, of shape (9, 9, 4), describe a layout of groups with one sum each."""
+        groups, sums = cls.layout(borders), np.asarray(sums)
+        if groups is None:
+            return False
+        for group in np.unique(groups):
+            totals = sums[groups == group]
+            if np.count_nonzero(totals) != 1 or not cls.feasible(len(totals), totals.max()):
+                return False
+        return True
+
+    @staticmethod
+    def join(below: np.ndarray, beside: np.ndarray) -> np.ndarray:
+        """Returns the top, bottom, left and right borders of every box, in an array of shape (9, 9, 4), 
+        given which edges below and to the right of each box are borders. The outer edges are borders."""
+        size = below.shape[1]
+        borders = np.ones((size, size, 4), dtype=bool)
+        borders[:-1, :, 1] = borders[1:, :, 0] = below
+        borders[:, :-1, 3] = borders[:, 1:, 2] = beside
+        return borders
+
+    @classmethod
+    def grow(cls, below: np.ndarray, beside: np.ndarray, sums: np.ndarray) -> np.ndarray:
+        """Returns the group number of every box after growing the groups from the boxes with a sum, 
+        given the probability of the edges below and to the right of each box being borders."""
+        size = sums.shape[1]
+        edges = sorted([(p, i * size + j, (i + 1) * size + j) for (i, j), p in np.ndenumerate(below)] +
+                       [(p, i * size + j, i * size + j + 1) for (i, j), p in np.ndenumerate(beside)])
+        parent, members, totals = list(range(size * size)), [1] * size * size, sums.ravel().tolist()
+        for p, a, b in edges:
+            if p >= cls.cutoff:
+                break
+            a, b = find(parent, a), find(parent, b)
+            # a group may not have two sums, or more boxes than the smallest digits allowed by its sum
+            total, count = totals[a] or totals[b], members[a] + members[b]
+            if a == b or (totals[a] and totals[b]) or count > SUDOKU_SIZE or (total and count * (count + 1) // 2 > total):
+                continue
+            parent[b] = a
+            members[a], totals[a] = count, total
+        return np.array([find(parent, x) for x in range(size * size)]).reshape(size, size)
+
+    @classmethod
+    def reconcile(cls, probabilities: np.ndarray, sums: np.ndarray) -> np.ndarray:
+        """Returns the borders of a board, repaired to be consistent where possible.
+
+        The thresholded probabilities are kept if they are consistent. Otherwise the groups are grown
+        from the sums, only opening edges below BorderReconciler.cutoff, which is kept if it is 
+        consistent. Otherwise, as when a sum was misread, every edge is settled by the combined 
+        probability of its two sides, which makes the sides of neighbouring boxes agree and keeps
+        the thresholded borders where they already agree.
+
+        Parameters
+        ----------
+        probabilities: np.ndarray
+            The probability of the top, bottom, left and right sides of every box being a border, 
+            in an array of shape (9, 9, 4).
+        sums: np.ndarray
+            The sum found in every box, or 0, in an array of shape (9, 9).
+
+        Returns
+        -------
+        borders: np.ndarray
+            The top, bottom, left and right borders of every box.
+        """
+        probabilities, sums = np.asarray(probabilities, dtype=float), np.asarray(sums, dtype=int)
+        borders = probabilities >= 0.5
+        if cls.consistent(borders, sums):
+            return borders
+
+        below, beside = cls.edges(probabilities)
+        if sums.any():
+            grown = cls.borders(cls.grow(below, beside, sums))
+            if cls.consistent(grown, sums):
+                return grown
+        return cls.join(below >= 0.5, beside >= 0.5)
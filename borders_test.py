@@ -0,0 +1,75 @@
+"""Usage: python -m pytest"""
+
+import numpy as np
+from borders import BorderReconciler
+
+
+def layout() -> tuple[np.ndarray, np.ndarray]:
+    """Returns the borders of a board split into rows of three boxes, and a sum of 15 in the first box of each group."""
+    groups = np.arange(81).reshape(9, 9) // 3
+    sums = np.zeros((9, 9), dtype=int)
+    sums[:, ::3] = 15
+    return BorderReconciler.borders(groups), sums
+
+
+# ========== consistent() ==========
+def test_consistent_1():
+    """Test description: layout with one sum per group"""
+    borders, sums = layout()
+    assert BorderReconciler.consistent(borders, sums)
+
+def test_consistent_2():
+    """Test description: sides disagree, two sums in a group, or sum out of reach of the group"""
+    borders, sums = layout()
+    disagree = borders.copy()
+    disagree[0, 2, 3] = False
+    assert not BorderReconciler.consistent(disagree, sums)
+    merged = borders.copy()
+    merged[0, 2, 3] = merged[0, 3, 2] = False
+    assert not BorderReconciler.consistent(merged, sums)
+    small = sums.copy()
+    small[0, 0] = 4
+    assert not BorderReconciler.consistent(borders, small)
+
+# ========== reconcile() ==========
+def test_reconcile_1():
+    """Test description: consistent borders are kept"""
+    borders, sums = layout()
+    assert np.array_equal(BorderReconciler.reconcile(np.where(borders, 0.9, 0.1), sums), borders)
+
+def test_reconcile_2():
+    """Test description: the more confident side wins when the sides disagree"""
+    borders, sums = layout()
+    probabilities = np.where(borders, 0.9, 0.1)
+    probabilities[0, 2, 3] = 0.3
+    probabilities[4, 4, 1] = 0.8
+    assert np.array_equal(BorderReconciler.reconcile(probabilities, sums), borders)
+
+def test_reconcile_3():
+    """Test description: a missed border between two sums and a border cutting a box off its sum are repaired"""
+    borders, sums = layout()
+    probabilities = np.where(borders, 0.9, 0.1)
+    probabilities[0, 2, 3] = probabilities[0, 3, 2] = 0.4
+    probabilities[5, 1, 3] = probabilities[5, 2, 2] = 0.6
+    assert np.array_equal(BorderReconciler.reconcile(probabilities, sums), borders)
+
+def test_reconcile_4():
+    """Test description: sides agree without sums, or with a missed sum"""
+    borders, sums = layout()
+    probabilities = np.where(borders, 0.9, 0.1)
+    probabilities[0, 2, 3] = 0.3
+    probabilities[2, 4, 3] = 0.7
+    sums[3, 3] = 0
+    for found in (np.zeros((9, 9)), sums):
+        repaired = BorderReconciler.reconcile(probabilities, found)
+        assert repaired[0, 2, 3] and repaired[0, 3, 2]
+        assert not repaired[2, 4, 3] and not repaired[2, 5, 2]
+
+def test_reconcile_5():
+    """Test description: a misread sum does not merge groups across confident borders"""
+    borders, sums = layout()
+    sums[3, 0], sums[3, 3] = 21, 0
+    probabilities = np.where(borders, 0.99, 0.01)
+    assert np.array_equal(BorderReconciler.reconcile(probabilities, sums), borders)
+    probabilities[0, 2, 3] = 0.3
+    assert np.array_equal(BorderReconciler.reconcile(probabilities, sums), borders)
@@ -0,0 +1,158 @@
+"""This module caches the inferences made on images, keyed by a hash of their content."""
+
+from collections import OrderedDict
+from typing import Any
+import threading
+import hashlib
+import pathlib
+import json
+import copy
+import time
+import os
+import numpy as np
+
+
+class ImageCache:
+    """A content addressed cache with an in-memory LRU layer and an optional on-disk layer.
+
+    Values must be JSON serializable. They are copied when stored and when returned, so callers
+    are free to modify them. The disk layer stores one JSON file per key. The size of every file
+    is indexed when the directory is opened and kept up to date afterwards, so that once the
+    files exceed max_bytes, the least recently used ones are removed down to low_water of
+    max_bytes without listing the directory again.
+    """
+    def __init__(self: 'ImageCache', capacity: int = 1024, directory: str | os.PathLike | None = None,
+                 max_bytes: int = 64 * 2 ** 20, low_water: float = 0.9) -> None:
+        """Creates an empty cache.
+
+        Parameters
+        ----------
+        capacity: int
+            The number of values kept in memory.
+        directory: str | os.PathLike | None
+            The directory of the disk layer. If None, values are only kept in memory.
+        max_bytes: int
+            The total size of the files of the disk layer.
+        low_water: float
+            The fraction of max_bytes the disk layer is brought down to when it exceeds max_bytes.
+        """
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+        self.directory = None
+        self.files = OrderedDict() # size of the file of every key on disk, from least to most recently used
+        self.disk_bytes = 0
+        self.clock = 0 # last modification time given to a file, in nanoseconds
+        if directory is not None:
+            self.open(directory)
+
+    def open(self: 'ImageCache', directory: str | os.PathLike) -> None:
+        """Stores values in the given directory as well as in memory. The files already in the 
+        directory are indexed, ordered by their modification time."""
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in directory.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime_ns, path.stem, stat.st_size))
+        files.sort()
+        with self.lock:
+            self.directory = directory
+            self.files = OrderedDict((key, size) for _, key, size in files)
+            self.disk_bytes = sum(self.files.values())
+            self.clock = max([self.clock] + [mtime for mtime, _, _ in files])
+
+    @staticmethod
+    def key(image: np.ndarray, *extra: Any) -> str:
+        """Returns the hash of the content, shape and type of an image, and of any extra values."""
+        image = np.ascontiguousarray(image)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((image.shape, image.dtype.str, extra)).encode())
+        digest.update(image.data)
+        return digest.hexdigest()
+
+    def get(self: 'ImageCache', key: str) -> Any | None:
+        """Returns a copy of the value stored for the key, or None if there is none."""
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self.memory[key])
+            value = self.read(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.remember(key, value)
+            return copy.deepcopy(value)
+
+    def put(self: 'ImageCache', key: str, value: Any) -> None:
+        """Stores a copy of the value for the key."""
+        with self.lock:
+            self.remember(key, copy.deepcopy(value))
+            self.write(key, value)
+
+    def clear(self: 'ImageCache') -> None:
+        """Removes every value, including those on disk."""
+        with self.lock:
+            self.memory.clear()
+            if self.directory is not None:
+                for path in self.directory.glob('*.json'):
+                    path.unlink(missing_ok=True)
+                self.files.clear()
+                self.disk_bytes = 0
+
+    def remember(self: 'ImageCache', key: str, value: Any) -> None:
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def read(self: 'ImageCache', key: str) -> Any | None:
+        if self.directory is None:
+            return None
+        path = self.directory / f'{key}.json'
+        try:
+            data = path.read_text()
+            value = json.loads(data)
+            self.touch(path)
+        except (OSError, ValueError):
+            return None
+        # files written by another process since the directory was opened are indexed as they are read
+        self.disk_bytes += len(data) - self.files.pop(key, 0)
+        self.files[key] = len(data)
+        return value
+
+    def write(self: 'ImageCache', key: str, value: Any) -> None:
+        if self.directory is None:
+            return
+        path = self.directory / f'{key}.json'
+        data = json.dumps(value)
+        try:
+            path.write_text(data)
+            self.touch(path)
+        except OSError:
+            return
+        self.disk_bytes += len(data) - self.files.pop(key, 0)
+        self.files[key] = len(data)
+        if self.disk_bytes > self.max_bytes:
+            self.evict()
+
+    def touch(self: 'ImageCache', path: pathlib.Path) -> None:
+        """Marks the file as the most recently used. The modification time orders the files from least 
+        to most recently used, so it is kept increasing even if the clock of the file system is coarse."""
+        self.clock = max(time.time_ns(), self.clock + 1)
+        os.utime(path, ns=(self.clock, self.clock))
+
+    def evict(self: 'ImageCache') -> None:
+        """Removes the least recently used files until the disk layer fits in low_water of max_bytes."""
+        while self.files and self.disk_bytes > self.low_water * self.max_bytes:
+            key, size = self.files.popitem(last=False)
+            (self.directory / f'{key}.json').unlink(missing_ok=True)
+            self.disk_bytes -= size
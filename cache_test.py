@@ -0,0 +1,85 @@
+"""Usage: python -m pytest"""
+
+import pathlib
+import numpy as np
+import pytest
+from cache import ImageCache
+
+
+# ========== key() ==========
+def test_key_1():
+    """Test description: same content gives the same key"""
+    image = np.arange(12).reshape(3, 4)
+    assert ImageCache.key(image) == ImageCache.key(image.copy())
+    assert ImageCache.key(image) == ImageCache.key(np.asfortranarray(image))
+
+def test_key_2():
+    """Test description: shape, type, content and extra values change the key"""
+    image = np.arange(12).reshape(3, 4)
+    keys = {ImageCache.key(image), ImageCache.key(image.reshape(4, 3)), ImageCache.key(image.astype(np.int32)),
+            ImageCache.key(image + 1), ImageCache.key(image, 'other models')}
+    assert len(keys) == 5
+
+# ========== get() and put() ==========
+def test_get_1():
+    """Test description: values are copied"""
+    cache = ImageCache()
+    value = [['1', 2], [True]]
+    cache.put('a', value)
+    value[0][0] = '9'
+    result = cache.get('a')
+    assert result == [['1', 2], [True]]
+    result[0][0] = '9'
+    assert cache.get('a') == [['1', 2], [True]]
+    assert (cache.hits, cache.misses) == (2, 0)
+
+def test_get_2():
+    """Test description: least recently used value is dropped"""
+    cache = ImageCache(capacity=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert [cache.get(x) for x in 'abc'] == [1, None, 3]
+
+def test_get_3():
+    """Test description: values are read back from disk"""
+    directory = pytest.importorskip('tempfile').mkdtemp()
+    ImageCache(directory=directory).put('a', ['7', 12, True, False, True, False])
+    assert ImageCache(directory=directory).get('a') == ['7', 12, True, False, True, False]
+
+def test_put_1():
+    """Test description: disk layer is bounded in size"""
+    directory = pytest.importorskip('tempfile').mkdtemp()
+    cache = ImageCache(capacity=1, directory=directory, max_bytes=100)
+    for k in range(20):
+        cache.put(str(k), 'x' * 20)
+    assert cache.disk_bytes <= 100
+    assert cache.get('19') == 'x' * 20
+    assert cache.get('0') is None
+
+def test_put_2(monkeypatch):
+    """Test description: eviction uses the index of the files, down to the low water mark"""
+    directory = pytest.importorskip('tempfile').mkdtemp()
+    cache = ImageCache(capacity=1, directory=directory, max_bytes=220)
+    for k in range(10):
+        cache.put(str(k), 'x' * 20)
+    cache.get('0')
+
+    # the files are indexed once, from least to most recently used
+    cache = ImageCache(capacity=1, directory=directory, max_bytes=220)
+    assert list(cache.files) == [str(k) for k in range(1, 10)] + ['0'] and cache.disk_bytes == 220
+    monkeypatch.setattr(pathlib.Path, 'glob', lambda *args: pytest.fail('directory listed'))
+    monkeypatch.setattr(pathlib.Path, 'stat', lambda *args: pytest.fail('file size read'))
+    cache.put('10', 'x' * 20)
+    assert cache.disk_bytes == 198 and list(cache.files) == [str(k) for k in range(3, 10)] + ['0', '10']
+    assert cache.get('1') is None and cache.get('0') == 'x' * 20
+
+def test_clear_1():
+    """Test description: every layer is emptied"""
+    directory = pytest.importorskip('tempfile').mkdtemp()
+    cache = ImageCache(directory=directory)
+    cache.put('a', 1)
+    cache.clear()
+    assert cache.get('a') is None
+    assert ImageCache(directory=directory).get('a') is None
@@ -0,0 +1,80 @@
+"""This module precomputes the digit combinations which can fill a group in killer sudoku."""
+
+from array import array
+from config import *
+
+
+MAX_SUM = SUDOKU_SIZE * (SUDOKU_SIZE + 1) // 2
+
+
+def cage_index(size: int, total: int, used: int = 0) -> int:
+    """Returns the position of (size, total, used) in CAGE_TABLE.
+
+    Parameters
+    ----------
+    size: int
+        The number of positions in the group.
+    total: int
+        The sum of the group.
+    used: int
+        The mask of digits already placed in the group. The digit d is represented by the bit 1 << (d - 1).
+
+    Returns
+    -------
+    index: int
+        The position of the entry in CAGE_TABLE.
+    """
+    return (size * (MAX_SUM + 1) + total) << SUDOKU_SIZE | used
+
+
+def build_cage_table() -> tuple[array, dict[tuple[int, int]: tuple[int]]]:
+    """Enumerates every set of distinct digits to build the combination tables.
+
+    Returns
+    -------
+    table: array
+        The mask of digits allowed in the empty positions of a group, indexed by cage_index.
+    combinations: dict[tuple[int, int]: tuple[int]]
+        A dictionary linking (size, total) to the masks of all digit sets of that size and sum.
+    """
+    table = array('H', bytes(2 * cage_index(SUDOKU_SIZE + 1, 0)))
+    combinations = {}
+    for combination in range(1 << SUDOKU_SIZE):
+        digits = [d for d in range(1, SUDOKU_SIZE + 1) if combination >> (d - 1) & 1]
+        size, total = len(digits), sum(digits)
+        combinations.setdefault((size, total), []).append(combination)
+
+        # every subset of the combination could be the digits already placed
+        used = combination
+        while True:
+            table[cage_index(size, total, used)] |= combination & ~used
+            if used == 0:
+                break
+            used = (used - 1) & combination
+    return table, {key: tuple(value) for key, value in combinations.items()}
+
+
+CAGE_TABLE, CAGE_COMBINATIONS = build_cage_table()
+
+
+def allowed_digits(size: int, total: int, used: int = 0) -> int:
+    """Returns the mask of digits which can still be placed in a group.
+
+    Parameters
+    ----------
+    size: int
+        The number of positions in the group.
+    total: int
+        The sum of the group.
+    used: int
+        The mask of digits already placed in the group.
+
+    Returns
+    -------
+    mask: int
+        The mask of digits that appear in at least one set of distinct digits of the given
+        size and sum which contains the used digits, excluding the used digits.
+    """
+    if not (0 <= size <= SUDOKU_SIZE and 0 <= total <= MAX_SUM and 0 <= used <= ALL_DIGITS):
+        return 0
+    return CAGE_TABLE[cage_index(size, total, used)]
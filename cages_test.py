@@ -0,0 +1,53 @@
+"""Usage: python -m pytest"""
+
+import pytest
+from cages import CAGE_COMBINATIONS, allowed_digits
+
+
+def mask(*digits: int) -> int:
+    """Returns the mask representing the digits."""
+    return sum(1 << (d - 1) for d in digits)
+
+# ========== allowed_digits() ==========
+def test_allowed_digits_1():
+    """Test description: a group of 2 summing to 3 must be {1, 2}"""
+    assert allowed_digits(2, 3) == mask(1, 2)
+
+def test_allowed_digits_2():
+    """Test description: a group of 2 summing to 17 must be {8, 9}"""
+    assert allowed_digits(2, 17) == mask(8, 9)
+
+def test_allowed_digits_3():
+    """Test description: digits already placed are excluded"""
+    assert allowed_digits(2, 10, mask(3)) == mask(7)
+
+def test_allowed_digits_4():
+    """Test description: a group of 3 summing to 10 with a 1 placed"""
+    assert allowed_digits(3, 10, mask(1)) == mask(2, 3, 4, 5, 6, 7)
+
+def test_allowed_digits_5():
+    """Test description: no combination contains the digits already placed"""
+    assert allowed_digits(2, 5, mask(5)) == 0
+
+def test_allowed_digits_6():
+    """Test description: impossible sum"""
+    assert allowed_digits(2, 18) == 0
+
+def test_allowed_digits_7():
+    """Test description: parameters out of range"""
+    assert allowed_digits(10, 45) == 0
+    assert allowed_digits(3, 46) == 0
+    assert allowed_digits(3, -1) == 0
+
+def test_allowed_digits_8():
+    """Test description: a group of 9 must contain every digit"""
+    assert allowed_digits(9, 45) == mask(*range(1, 10))
+
+# ========== CAGE_COMBINATIONS ==========
+def test_cage_combinations_1():
+    """Test description: all combinations of 3 digits summing to 8"""
+    assert sorted(CAGE_COMBINATIONS[(3, 8)]) == sorted([mask(1, 2, 5), mask(1, 3, 4)])
+
+def test_cage_combinations_2():
+    """Test description: every set of digits is listed once"""
+    assert sum(len(x) for x in CAGE_COMBINATIONS.values()) == 1 << 9
@@ -1,3 +1,4 @@
 SUDOKU_SIZE=9
 SUDOKU_BOX_SIZE=3
-ACTIONS=[str(x) for x in range(1, 10)]
\ No newline at end of file
+ACTIONS=[str(x) for x in range(1, 10)]
+ALL_DIGITS=(1 << SUDOKU_SIZE) - 1
\ No newline at end of file
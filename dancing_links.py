@@ -0,0 +1,134 @@
+"""This module implements Knuth's Algorithm X with dancing links to solve exact cover problems."""
+
+from typing import Hashable, Iterator
+import time
+
+
+class DancingLinks:
+    """A sparse 0/1 matrix stored as circular doubly linked lists.
+
+    Every node is an index into the link arrays. Node 0 is the root, nodes 1 to the number of
+    columns are the column headers and the remaining nodes are the 1s of the matrix.
+    """
+    def __init__(self: 'DancingLinks', columns: int) -> None:
+        """Creates an empty matrix.
+
+        Parameters
+        ----------
+        columns: int
+            The number of constraints, each of which has to be covered exactly once.
+        """
+        headers = range(columns + 1)
+        self.left = [i - 1 for i in headers]
+        self.right = [i + 1 for i in headers]
+        self.left[0], self.right[columns] = columns, 0
+        self.up = list(headers)
+        self.down = list(headers)
+        self.column = list(headers)
+        self.row = [-1] * (columns + 1) # index of the row containing each node
+        self.size = [0] * (columns + 1) # number of nodes in each column
+        self.labels = []
+        self.nodes = 0 # number of rows chosen during the search
+        self.deadline = None # time.perf_counter() value after which the search gives up
+
+    def add_row(self: 'DancingLinks', columns: list[int], label: Hashable) -> None:
+        """Adds a row with 1s in the given columns.
+
+        Parameters
+        ----------
+        columns: list[int]
+            The constraints covered by the row, numbered from 0.
+        label: Hashable
+            The value reported for the row when it is part of a solution.
+        """
+        first = len(self.column)
+        for k, col in enumerate(columns):
+            node, header = first + k, col + 1
+            self.left.append(node - 1 if k else first + len(columns) - 1)
+            self.right.append(node + 1 if k < len(columns) - 1 else first)
+            self.up.append(self.up[header])
+            self.down.append(header)
+            self.down[self.up[header]] = node
+            self.up[header] = node
+            self.column.append(header)
+            self.row.append(len(self.labels))
+            self.size[header] += 1
+        self.labels.append(label)
+
+    def cover(self: 'DancingLinks', c: int) -> None:
+        """Removes column c and every row that has a 1 in it."""
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[c]], left[right[c]] = right[c], left[c]
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                down[up[j]], up[down[j]] = down[j], up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self: 'DancingLinks', c: int) -> None:
+        """Restores column c and its rows. This undoes DancingLinks.cover."""
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[c]] = left[right[c]] = c
+
+    def search(self: 'DancingLinks') -> Iterator[list[Hashable]]:
+        """Yields the labels of the rows of every exact cover.
+
+        The search keeps an explicit stack of the chosen rows instead of recursing. Columns with
+        the fewest rows are covered first. The matrix is restored once the generator is exhausted.
+        If DancingLinks.deadline passes during the search, TimeoutError is raised.
+        """
+        left, right, down, up, column, size = self.left, self.right, self.down, self.up, self.column, self.size
+        chosen = []
+        r = -1 # row node to try next, -1 when a new column has to be chosen
+        while True:
+            if r == -1:
+                if right[0] == 0:
+                    yield [self.labels[self.row[node]] for node in chosen]
+                    r = -2
+                else:
+                    # choose the column with the fewest rows
+                    c, best, fewest = right[0], right[0], size[right[0]]
+                    while c != 0 and fewest > 1:
+                        if size[c] < fewest:
+                            best, fewest = c, size[c]
+                        c = right[c]
+                    self.cover(best)
+                    r = down[best]
+
+            if r >= 0 and r == column[r]:
+                # every row of the column has been tried
+                self.uncover(r)
+                r = -2
+            if r == -2:
+                # backtrack to the last row chosen
+                if not chosen:
+                    return
+                r = chosen.pop()
+                j = left[r]
+                while j != r:
+                    self.uncover(column[j])
+                    j = left[j]
+                r = down[r]
+                continue
+
+            # choose row r
+            chosen.append(r)
+            self.nodes += 1
+            if self.deadline is not None and self.nodes & 1023 == 0 and time.perf_counter() > self.deadline:
+                raise TimeoutError(f'no exact cover found within {self.nodes} rows chosen')
+            j = right[r]
+            while j != r:
+                self.cover(column[j])
+                j = right[j]
+            r = -1
@@ -0,0 +1,71 @@
+"""Usage: python -m pytest"""
+
+import copy
+import pytest
+from dancing_links import DancingLinks
+from solver import KillerSudokuSolver, FastKillerSudokuSolver, DancingLinksSolver, SOLVERS
+from solver_2_test import board, solution
+from solver_3_test import game
+
+
+def knuth() -> DancingLinks:
+    """Returns the example exact cover problem from Knuth's paper."""
+    matrix = DancingLinks(7)
+    for label, columns in enumerate([[2, 4, 5], [0, 3, 6], [1, 2, 5], [0, 3], [1, 6], [3, 4, 6]]):
+        matrix.add_row(columns, label)
+    return matrix
+
+# ========== DancingLinks ==========
+def test_dancing_links_1():
+    """Test description: single exact cover"""
+    assert [sorted(x) for x in knuth().search()] == [[0, 3, 4]]
+
+def test_dancing_links_2():
+    """Test description: no exact cover"""
+    matrix = DancingLinks(3)
+    matrix.add_row([0, 1], 'a')
+    matrix.add_row([1, 2], 'b')
+    assert list(matrix.search()) == []
+
+def test_dancing_links_3():
+    """Test description: every exact cover is found"""
+    matrix = DancingLinks(2)
+    matrix.add_row([0], 'a')
+    matrix.add_row([1], 'b')
+    matrix.add_row([0, 1], 'c')
+    assert sorted(sorted(x) for x in matrix.search()) == [['a', 'b'], ['c']]
+
+def test_dancing_links_4():
+    """Test description: matrix is restored after the search"""
+    matrix = knuth()
+    links = copy.deepcopy((matrix.left, matrix.right, matrix.up, matrix.down, matrix.size))
+    list(matrix.search())
+    assert (matrix.left, matrix.right, matrix.up, matrix.down, matrix.size) == links
+
+# ========== DancingLinksSolver ==========
+def test_dancing_links_solver_1():
+    """Test description: valid board with solution"""
+    assert DancingLinksSolver.solve(*game()) == solution
+
+def test_dancing_links_solver_2():
+    """Test description: board without any values placed"""
+    data = list(game())
+    data[0] = [[''] * 9 for _ in range(9)]
+    assert DancingLinksSolver.solve(*data) == solution
+
+def test_dancing_links_solver_3():
+    """Test description: invalid board without solution"""
+    data = game()
+    data[0][0][0] = '1'
+    assert DancingLinksSolver.solve(*data) == None
+
+def test_dancing_links_solver_4():
+    """Test description: number of rows chosen is recorded"""
+    stats = {}
+    DancingLinksSolver.solve(*game(), stats=stats)
+    assert stats['nodes'] >= 81
+
+@pytest.mark.parametrize('name', list(SOLVERS))
+def test_solvers_1(name):
+    """Test description: every solver finds the same solution"""
+    assert SOLVERS[name].solve(*game()) == solution
@@ -2,49 +2,208 @@
 
 import numpy as np
 import skimage
+import scipy.ndimage
+import pathlib
+import os
 import prediction
 
 
+from typing import Iterable, NamedTuple
+from borders import BorderReconciler
+from cache import ImageCache
 from config import *
 
 
+# format of the values stored in the caches, part of every key so that entries written by earlier
+# versions are never read. Bump it whenever the value of Detection.cell or DetectionResult changes
+CACHE_FORMAT = 3
+
+# inferences of boxes by their thresholded image, and of boards by their screenshot
+CELL_CACHE = ImageCache(capacity=4096)
+BOARD_CACHE = ImageCache(capacity=64)
+if os.environ.get('KILLER_SUDOKU_CACHE'):
+    CELL_CACHE.open(pathlib.Path(os.environ['KILLER_SUDOKU_CACHE'], 'cells'))
+    BOARD_CACHE.open(pathlib.Path(os.environ['KILLER_SUDOKU_CACHE'], 'boards'))
+
+
+# kinds of components returned by Detection.classify
+DIGIT, SUM = 1, 2
+
+
+class Blob(NamedTuple):
+    """A connected component of the image of a box, in the coordinates of the box."""
+    zones: np.ndarray # labelled image containing the component
+    label: int
+    bbox: tuple[int, int, int, int]
+    area: int
+
+
+class DetectionResult(NamedTuple):
+    """The inferences made on a board by Detection.scan, with the probabilities they were read from.
+    The first six fields are the board, sums and borders returned by Detection.process_board."""
+    board: list[list[str]]
+    sums: list[list[int]]
+    top: list[list[bool]]
+    bottom: list[list[bool]]
+    left: list[list[bool]]
+    right: list[list[bool]]
+    borders: list[list[list[float]]] # probability of a top, bottom, left and right border in each box
+    digits: list[list[list]] # kind and probabilities of 0 to 9 of each digit image of each box, from left to right
+
+    def data(self: 'DetectionResult') -> tuple[list]:
+        """Returns the board, sums, top, bottom, left and right borders."""
+        return tuple(self[:6])
+
+    def confidence(self: 'DetectionResult') -> np.ndarray:
+        """Returns the confidence in each box, the lowest probability of a border or digit of the box 
+        being read right. The borders are taken before BorderReconciler repairs them."""
+        borders = np.asarray(self.borders, dtype=float)
+        confidence = np.maximum(borders, 1 - borders).min(axis=-1)
+        for i, row in enumerate(self.digits):
+            for j, digits in enumerate(row):
+                for _, probabilities in digits:
+                    confidence[i, j] = min(confidence[i, j], max(probabilities))
+        return confidence
+
+    def uncertain(self: 'DetectionResult', threshold: float = 0.9) -> list[tuple[int, int]]:
+        """Returns the positions of the boxes with a confidence below the threshold."""
+        return [(int(i), int(j)) for i, j in np.argwhere(self.confidence() < threshold)]
+
+
 class Detection:
     @staticmethod
-    def detect(image: np.ndarray) -> tuple[str, int, bool, bool, bool, bool]:
-        """Returns the inferences for this box - digit, sum, top border, bottom border, left border, right border"""
-        output = ['', 0, False, False, False, False]
+    def detect(image: np.ndarray, stats: dict | None = None) -> tuple[str, int, bool, bool, bool, bool]:
+        """Returns the inferences for this box - digit, sum, top border, bottom border, left border, right border.
+        See Detection.process_board for the parameters."""
+        key = CELL_CACHE.key(image, CACHE_FORMAT, prediction.Predictor.fingerprint())
+        cell = CELL_CACHE.get(key)
+        if cell is None:
+            box, kinds, digits = Detection.extract(image)
+            borders = Detection.detect_borders(box[np.newaxis], stats)
+            values = prediction.Predictor.digit_probabilities(digits) if len(digits) else np.empty((0, 10))
+            cell = Detection.cell(borders[0], kinds, values)
+            CELL_CACHE.put(key, cell)
+        return cell[0]
+
+    @staticmethod
+    def detect_borders(boxes: np.ndarray, stats: dict | None = None) -> np.ndarray:
+        """Returns the probability of a top, bottom, left and right border in each box, from the wall recognizer."""
+        if stats is not None:
+            stats['boxes'] = stats.get('boxes', 0) + len(boxes)
+        if not len(boxes):
+            return np.empty((0, 4))
+        return prediction.Predictor.border_probabilities(boxes)
 
-        # detect borders
+    @staticmethod
+    def extract(image: np.ndarray, scale: float = 1) -> tuple[np.ndarray, list[str], np.ndarray]:
+        """Returns the images of this box to run inference on - the box image for the border model, 
+        and the batch of digit images for the digit model from left to right, with the kind of each 
+        digit, 'digit' or 'sum'. The scale is that of the image relative to the screenshot."""
         box = Detection.preprocess_box_region(image)
-        output[2], output[3], output[4], output[5] = prediction.Predictor.detect_borders(box)
 
         # get regions of interest
-        image_height, image_width = image.shape
         zones = skimage.measure.label(image, connectivity=1)
-        regions = skimage.measure.regionprops(zones)
-
-        # process roi from left to right, top to bottom
-        regions.sort(key=lambda x: (x.bbox[1], x.bbox[0])) 
-
-        # extract digits
-        for region in regions:
-            ymin, xmin, ymax, xmax = region.bbox
-            width, height = xmax - xmin, ymax - ymin
-            area = region.area
-            num_pixels = region.num_pixels
-            
-            if width > 0.9 * image_width or height > 0.9 * image_height:
-                # area too big
-                continue
-            elif xmax >= image_width / 2 and xmin <= image_width / 2 and ymax >= image_height // 2 and ymin <= image_height // 2 and area >= 13 and height / width >= 1:
-                # detect center digits
-                box = Detection.preprocess_digit_region(zones, region)
-                output[0] = str(prediction.Predictor.detect_digit(box))
-            elif xmin < image_width / 2 and ymax < image_height / 2 and height > 2 and area >= 10 and 3 >= height / width >= 1 and num_pixels != width * height:
-                # detect sum digits
-                box = Detection.preprocess_digit_region(zones, region)
+        bboxes, areas = Detection.components(zones)
+        kinds = Detection.classify(bboxes, areas, *image.shape, scale=scale)
+        candidates = Detection.select([(kinds[n], Blob(zones, n + 1, tuple(bboxes[n]), areas[n])) for n in np.flatnonzero(kinds)])
+        return (box, *Detection.digit_images(candidates))
+
+    @staticmethod
+    def extract_board(regions: np.ndarray, offset: int = 5) -> tuple[np.ndarray, list[list[str]], np.ndarray]:
+        """Returns the images of every box to run inference on, as Detection.extract does for each crop 
+        of Detection.crop_cells, but labelling the connected components of the board only once.
+        The digit images of every box are returned as a single batch, in the order of the boxes.
+
+        The crops are laid out in a grid of tiles separated by a blank line, so that components 
+        cannot join across crops, and the tiles are labelled together.
+        """
+        windows = Detection.crop_windows(regions.shape, offset)
+        sizes = windows[:, 2:] - windows[:, :2]
+        pitch = sizes.max(axis=0) + 1
+        tiles = np.zeros((SUDOKU_SIZE, pitch[0], SUDOKU_SIZE, pitch[1]), dtype=regions.dtype)
+        boxes = np.empty((len(windows), 28, 28))
+        for size in np.unique(sizes, axis=0):
+            cells = np.flatnonzero((sizes == size).all(axis=1))
+            # strided view of every crop of this size, indexed by the corner of each crop
+            crops = np.lib.stride_tricks.sliding_window_view(regions, tuple(size))[windows[cells, 0], windows[cells, 1]]
+            tiles[cells // SUDOKU_SIZE, :size[0], cells % SUDOKU_SIZE, :size[1]] = crops
+            boxes[cells] = skimage.transform.resize(crops, (len(cells), 28, 28), preserve_range=True)
+        boxes[boxes < 1] = 0
+
+        # components of every crop, in the coordinates of the crop
+        zones = skimage.measure.label(tiles.reshape(pitch * SUDOKU_SIZE), connectivity=1)
+        bboxes, areas = Detection.components(zones)
+        rows, cols = bboxes[:, 0] // pitch[0], bboxes[:, 1] // pitch[1]
+        cells = rows * SUDOKU_SIZE + cols
+        local = bboxes - np.stack([rows * pitch[0], cols * pitch[1]] * 2, axis=1)
+        kinds = Detection.classify(local, areas, sizes[cells, 0], sizes[cells, 1])
+
+        candidates = [[] for _ in windows]
+        zones = zones.reshape(SUDOKU_SIZE, pitch[0], SUDOKU_SIZE, pitch[1])
+        for n in np.flatnonzero(kinds):
+            k = cells[n]
+            window = zones[rows[n], :sizes[k, 0], cols[n], :sizes[k, 1]]
+            candidates[k].append((kinds[n], Blob(window, n + 1, tuple(local[n]), areas[n])))
+        candidates = [Detection.select(x) for x in candidates]
+        kinds, digits = Detection.digit_images([x for cell in candidates for x in cell])
+        counts = np.cumsum([0] + [len(cell) for cell in candidates])
+        return boxes, [kinds[start:end] for start, end in zip(counts[:-1], counts[1:])], digits
+
+    @staticmethod
+    def components(zones: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the bounding boxes, as (ymin, xmin, ymax, xmax), and the areas of the connected 
+        components of a labelled image. The component with label n is at index n - 1."""
+        bboxes = [(rows.start, cols.start, rows.stop, cols.stop) for rows, cols in scipy.ndimage.find_objects(zones)]
+        return np.array(bboxes, dtype=int).reshape(-1, 4), np.bincount(zones.ravel(), minlength=len(bboxes) + 1)[1:]
+
+    @staticmethod
+    def classify(bboxes: np.ndarray, areas: np.ndarray, image_height: int | np.ndarray, image_width: int | np.ndarray, 
+                 scale: float = 1) -> np.ndarray:
+        """Returns DIGIT for the components which look like the digit placed in a box, SUM for those 
+        which look like a digit of the group sum and 0 for the rest. Arrays of boxes are broadcast.
+        The sizes in pixels are multiplied by the scale of the image relative to the screenshot."""
+        ymin, xmin, ymax, xmax = np.moveaxis(bboxes, -1, 0)
+        width, height = xmax - xmin, ymax - ymin
+
+        # area too big
+        small = (width <= 0.9 * image_width) & (height <= 0.9 * image_height)
+        # center digits
+        digit = small & (xmax >= image_width / 2) & (xmin <= image_width / 2) & (ymax >= image_height // 2) & (ymin <= image_height // 2) & (areas >= 13 * scale ** 2) & (height / width >= 1)
+        # sum digits
+        total = small & (xmin < image_width / 2) & (ymax < image_height / 2) & (height > 2 * scale) & (areas >= 10 * scale ** 2) & (height / width >= 1) & (height / width <= 3) & (areas != width * height)
+        return np.where(digit, DIGIT, np.where(total, SUM, 0))
+
+    @staticmethod
+    def select(candidates: list[tuple[int, Blob]]) -> list[tuple[int, Blob]]:
+        """Returns the components kept by Detection.classify in the order their digits are read."""
+        # process roi from left to right, top to bottom, then in the order of labelling the box
+        return sorted(candidates, key=lambda x: (x[1].bbox[1], x[1].bbox[0], Detection.first_column(x[1])))
+
+    @staticmethod
+    def digit_images(candidates: list[tuple[int, Blob]]) -> tuple[list[str], np.ndarray]:
+        """Returns the kind, 'digit' or 'sum', of each component and their digit images, written 
+        into a single batch for the digit model."""
+        images = np.empty((len(candidates), 28, 28))
+        for (_, blob), out in zip(candidates, images):
+            Detection.preprocess_digit_region(blob.zones, blob, out=out)
+        return ['digit' if kind == DIGIT else 'sum' for kind, _ in candidates], images
+
+    @staticmethod
+    def first_column(blob: Blob) -> int:
+        """Returns the column of the first pixel of the top row of a component."""
+        ymin, xmin, ymax, xmax = blob.bbox
+        return xmin + int(np.argmax(blob.zones[ymin, xmin:xmax] == blob.label))
+
+    @staticmethod
+    def assemble(borders: np.ndarray, kinds: list[str], values: list[int]) -> list:
+        """Combines the inferences made on the images of Detection.extract into the output of Detection.detect."""
+        output = ['', 0, *(bool(x) for x in borders)]
+        for kind, value in zip(kinds, values):
+            if kind == 'digit':
+                output[0] = str(value)
+            else:
                 output[1] *= 10
-                output[1] += prediction.Predictor.detect_digit(box)
+                output[1] += int(value)
         return output
 
     @staticmethod
@@ -56,49 +215,220 @@ class Detection:
         gray = skimage.color.rgb2gray(screen)
 
         # apply thresholding
-        thresholds = skimage.filters.threshold_multiotsu(gray)
-        regions = np.digitize(gray, bins=thresholds)
-        regions = (regions == 0).astype(int) * 255
-        return regions
+        return Detection.threshold(gray, skimage.filters.threshold_multiotsu(gray))
+
+    @staticmethod
+    def threshold(gray: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+        """Returns 255 where the grayscale image is darker than the lowest of the multi-Otsu thresholds, and 0 elsewhere."""
+        return (np.digitize(gray, bins=thresholds) == 0).astype(int) * 255
+
+    @staticmethod
+    def process_board(screen: np.ndarray, reconcile: bool = True, stats: dict | None = None) -> tuple[list]:
+        """Overall function to extract data from the image. Returns the board, sums, top, bottom, left
+        and right borders of Detection.scan, without the probabilities."""
+        return Detection.scan(screen, reconcile, stats).data()
 
     @staticmethod
-    def process_board(screen: np.ndarray) -> tuple[list]:
-        """Overall function to extract data from the image."""
+    def scan(screen: np.ndarray, reconcile: bool = True, stats: dict | None = None) -> 'DetectionResult':
+        """Returns the inferences made on the screenshot of a board, with their probabilities.
+        
+        The images of every box are collected first, then each model runs once on the whole board.
+        Boards and boxes seen before are found in the caches, and only new boxes are inferred.
+        If the borders found do not describe a layout of groups, they are repaired by BorderReconciler.
+
+        Parameters
+        ----------
+        screen: np.ndarray
+            The screenshot of the board.
+        reconcile: bool
+            If True, inconsistent borders are repaired with the probability of each side being a border.
+        stats: dict | None
+            If given, 'boxes' is increased by the number of boxes inferred, and 'repaired_sides' by 
+            the number of borders changed by BorderReconciler.
+        """
+        screen = np.asarray(screen)
+        fingerprint = prediction.Predictor.fingerprint()
+        key = BOARD_CACHE.key(screen, CACHE_FORMAT, fingerprint, reconcile)
+        cached = BOARD_CACHE.get(key)
+        if cached is not None:
+            return DetectionResult(*cached)
+
         regions = Detection.preprocess_board(screen)
-        height, width = regions.shape
+        cells = Detection.infer(regions, range(SUDOKU_SIZE ** 2), stats)
+        result = Detection.collect(cells, reconcile, stats)
+        BOARD_CACHE.put(key, result)
+        return result
 
-        board = [['' for _ in range(SUDOKU_SIZE)] for _ in range(SUDOKU_SIZE)]
-        sums = [[0 for _ in range(SUDOKU_SIZE)] for _ in range(SUDOKU_SIZE)]
-        top = [[False for _ in range(SUDOKU_SIZE)] for _ in range(SUDOKU_SIZE)]
-        bottom = [[False for _ in range(SUDOKU_SIZE)] for _ in range(SUDOKU_SIZE)]
-        left = [[False for _ in range(SUDOKU_SIZE)] for _ in range(SUDOKU_SIZE)]
-        right = [[False for _ in range(SUDOKU_SIZE)] for _ in range(SUDOKU_SIZE)]
+    @staticmethod
+    def infer(regions: np.ndarray, indices: Iterable[int], stats: dict | None = None) -> list[list | None]:
+        """Returns the inferences made on the boxes of the preprocessed board with the given indices, 
+        from left to right, top to bottom, as stored in CELL_CACHE, and None for the other boxes.
 
-        Ys = np.linspace(0, width, SUDOKU_SIZE + 1, dtype=int)
-        Xs = np.linspace(0, height, SUDOKU_SIZE + 1, dtype=int)
-        offset = 5
-        for i in range(SUDOKU_SIZE):
-            for j in range(SUDOKU_SIZE):
-                xmin, ymin, xmax, ymax = max(0, Xs[i] - offset), max(0, Ys[j] - offset), min(height, Xs[i + 1] + offset), min(width, Ys[j + 1] + offset)
-                crop = regions[xmin:xmax, ymin:ymax]
-                board[i][j], sums[i][j], top[i][j], bottom[i][j], left[i][j], right[i][j] = Detection.detect(crop)
-        return (board, sums, top, bottom, left, right)
+        Boxes seen before are found in CELL_CACHE. The images of the other boxes are collected from 
+        the whole board by Detection.extract_board, or from each crop by Detection.extract when there
+        are few of them, then each model runs once. See Detection.scan for the other parameters.
+        """
+        crops = Detection.crop_cells(regions)
+        fingerprint = prediction.Predictor.fingerprint()
+        keys = {k: CELL_CACHE.key(crops[k], CACHE_FORMAT, fingerprint) for k in indices}
+        cells = [None] * len(crops)
+        for k, x in keys.items():
+            cells[k] = CELL_CACHE.get(x)
+        missing = [k for k in keys if cells[k] is None]
+        if not missing:
+            return cells
 
+        # collect the images to run inference on
+        if 2 * len(missing) < len(crops):
+            views = [Detection.extract(crops[k]) for k in missing]
+            boxes = np.stack([box for box, _, _ in views])
+            kinds = [kinds for _, kinds, _ in views]
+            digits = np.concatenate([np.empty((0, 28, 28))] + [images for _, _, images in views])
+        else:
+            boxes, kinds, digits = Detection.extract_board(regions)
+            counts = np.cumsum([0] + [len(x) for x in kinds])
+            needed = np.concatenate([np.arange(counts[k], counts[k + 1]) for k in missing])
+            boxes, kinds, digits = boxes[missing], [kinds[k] for k in missing], digits[needed]
+
+        # one forward pass per model
+        borders = Detection.detect_borders(boxes, stats)
+        values = prediction.Predictor.digit_probabilities(digits) if len(digits) else np.empty((0, 10))
+
+        # map the inferences back to the boxes
+        start = 0
+        for k, found, probabilities in zip(missing, kinds, borders):
+            end = start + len(found)
+            cells[k] = Detection.cell(probabilities, found, values[start:end])
+            CELL_CACHE.put(keys[k], cells[k])
+            start = end
+        return cells
 
     @staticmethod
-    def preprocess_digit_region(zones: np.ndarray, region: np.ndarray, offset: int = 2) -> np.ndarray:
-        """Preprocesses the digit image for inference."""
-        image = zones.copy()
-        h, w = image.shape
+    def refine(screen: np.ndarray, result: 'DetectionResult', threshold: float = 0.9, scale: float = 1.5,
+               shifts: tuple[tuple[int, int], ...] = ((0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)),
+               reconcile: bool = True, stats: dict | None = None) -> 'DetectionResult':
+        """Infers the boxes read with a low confidence again, and returns the updated result.
+
+        Each uncertain box is cropped from the grayscale screenshot with every shift, upscaled and 
+        only then thresholded, so that the small digits of the sums are drawn with more pixels. The 
+        wall recognizer and the digit recognizer each run once on the views of every uncertain box. 
+        The probabilities of the views which find the same digits as the box are averaged with those 
+        of the box, and only replace the sides and digit images below the threshold.
+
+        Parameters
+        ----------
+        screen: np.ndarray
+            The screenshot the result was read from.
+        result: DetectionResult
+            The result of Detection.scan.
+        threshold: float
+            The confidence below which a box is inferred again. See DetectionResult.confidence.
+        scale: float
+            The factor the crops are upscaled by.
+        shifts: tuple[tuple[int, int], ...]
+            The offsets of the crops, in pixels of the screenshot, down and to the right.
+        reconcile: bool
+            If True, inconsistent borders are repaired afterwards. See Detection.scan.
+        stats: dict | None
+            If given, 'refined_boxes' is increased by the number of boxes inferred again, and 
+            'repaired_sides' as in Detection.scan.
+        """
+        uncertain = result.uncertain(threshold)
+        if not uncertain:
+            return result
+
+        # views of every uncertain box
+        gray = skimage.color.rgb2gray(np.asarray(screen))
+        thresholds = skimage.filters.threshold_multiotsu(gray)
+        windows = Detection.crop_windows(gray.shape)
+        views = []
+        for i, j in uncertain:
+            top, left, bottom, right = windows[i * SUDOKU_SIZE + j]
+            for dy, dx in shifts:
+                window = gray[max(0, top + dy):max(0, bottom + dy), max(0, left + dx):max(0, right + dx)]
+                upscaled = skimage.transform.rescale(window, scale, order=1)
+                views.append(Detection.extract(Detection.threshold(upscaled, thresholds), scale))
+
+        # one forward pass per model
+        boxes = np.stack([box for box, _, _ in views])
+        predicted = prediction.Predictor.border_probabilities(boxes)
+        digits = np.concatenate([np.empty((0, 28, 28))] + [images for _, _, images in views])
+        values = prediction.Predictor.digit_probabilities(digits) if len(digits) else np.empty((0, 10))
+        counts = np.cumsum([0] + [len(kinds) for _, kinds, _ in views])
+
+        flat = lambda grid: [x for row in grid for x in row]
+        cells = [Detection.cell(borders, [kind for kind, _ in found], [p for _, p in found])
+                 for borders, found in zip(flat(result.borders), flat(result.digits))]
+        for n, (i, j) in enumerate(uncertain):
+            # views which do not find the same digits as the box, such as when a stroke is lost, are left out
+            _, probabilities, found = cells[i * SUDOKU_SIZE + j]
+            kinds = [kind for kind, _ in found]
+            agreeing = [v for v in range(n * len(shifts), (n + 1) * len(shifts)) if views[v][1] == kinds]
+            if not agreeing:
+                continue
+            probabilities = np.array(probabilities)
+            unsure = np.maximum(probabilities, 1 - probabilities) < threshold
+            probabilities[unsure] = np.vstack([probabilities, predicted[agreeing]]).mean(axis=0)[unsure]
+            if kinds:
+                average = np.mean([[p for _, p in found]] + [values[counts[v]:counts[v + 1]] for v in agreeing], axis=0)
+                found = [[kind, average[m].tolist() if max(p) < threshold else p] for m, (kind, p) in enumerate(found)]
+            cells[i * SUDOKU_SIZE + j] = Detection.cell(probabilities, kinds, [p for _, p in found])
+        if stats is not None:
+            stats['refined_boxes'] = stats.get('refined_boxes', 0) + len(uncertain)
+        return Detection.collect(cells, reconcile, stats)
+
+    @staticmethod
+    def cell(borders: np.ndarray, kinds: list[str], values: np.ndarray) -> list:
+        """Returns the inferences made on a box, as stored in CELL_CACHE - the output of Detection.detect, 
+        the probability of each border and the kind and probabilities of each digit image."""
+        borders, values = np.asarray(borders, dtype=float), np.asarray(values, dtype=float).reshape(-1, 10)
+        output = Detection.assemble(borders >= 0.5, kinds, values.argmax(axis=1))
+        return [output, borders.tolist(), [[kind, p.tolist()] for kind, p in zip(kinds, values)]]
+
+    @staticmethod
+    def collect(cells: list[list], reconcile: bool = True, stats: dict | None = None) -> 'DetectionResult':
+        """Combines the inferences made on every box, from left to right, top to bottom, into the result for the board."""
+        outputs = [list(output) for output, _, _ in cells]
+        if reconcile:
+            sums = np.array([output[1] for output in outputs]).reshape(SUDOKU_SIZE, SUDOKU_SIZE)
+            found = np.array([output[2:] for output in outputs], dtype=bool).reshape(SUDOKU_SIZE, SUDOKU_SIZE, 4)
+            probabilities = np.array([borders for _, borders, _ in cells]).reshape(SUDOKU_SIZE, SUDOKU_SIZE, 4)
+            repaired = BorderReconciler.reconcile(probabilities, sums)
+            for output, borders in zip(outputs, repaired.reshape(-1, 4)):
+                output[2:] = borders.tolist()
+            if stats is not None:
+                stats['repaired_sides'] = stats.get('repaired_sides', 0) + int(np.count_nonzero(repaired != found))
 
-        # remove all other regions
-        image[zones != region.label] = 0 
-        image[zones == region.label] = 255
+        grid = lambda values: [list(values[i * SUDOKU_SIZE:(i + 1) * SUDOKU_SIZE]) for i in range(SUDOKU_SIZE)]
+        return DetectionResult(*(grid(column) for column in zip(*outputs)),
+                               grid([borders for _, borders, _ in cells]), grid([digits for _, _, digits in cells]))
 
-        # crop region around digit
+    @staticmethod
+    def crop_windows(shape: tuple[int, int], offset: int = 5) -> np.ndarray:
+        """Returns the top, left, bottom and right edges of the crop of every box from left to right, 
+        top to bottom, with offset pixels of margin."""
+        height, width = shape
+        Xs = np.linspace(0, height, SUDOKU_SIZE + 1, dtype=int)
+        Ys = np.linspace(0, width, SUDOKU_SIZE + 1, dtype=int)
+        tops, lefts = np.meshgrid(np.maximum(0, Xs[:-1] - offset), np.maximum(0, Ys[:-1] - offset), indexing='ij')
+        bottoms, rights = np.meshgrid(np.minimum(height, Xs[1:] + offset), np.minimum(width, Ys[1:] + offset), indexing='ij')
+        return np.stack([tops.ravel(), lefts.ravel(), bottoms.ravel(), rights.ravel()], axis=1)
+
+    @staticmethod
+    def crop_cells(regions: np.ndarray, offset: int = 5) -> list[np.ndarray]:
+        """Returns the image of every box from left to right, top to bottom, with offset pixels of margin."""
+        return [regions[top:bottom, left:right] for top, left, bottom, right in Detection.crop_windows(regions.shape, offset)]
+
+    @staticmethod
+    def preprocess_digit_region(zones: np.ndarray, region: np.ndarray, offset: int = 2, out: np.ndarray | None = None) -> np.ndarray:
+        """Preprocesses the digit image for inference. Only the window around the digit is read, and 
+        the 28x28 result is written to out if it is given."""
+        h, w = zones.shape
+
+        # crop region around digit and remove all other regions
         ymin, xmin, ymax, xmax = region.bbox
         ymin, xmin, ymax, xmax = max(0, ymin - offset), max(0, xmin - offset), min(h, ymax + offset), min(w, xmax + offset)
-        image = image[ymin:ymax, xmin:xmax]
+        image = (zones[ymin:ymax, xmin:xmax] == region.label) * 255
 
         # rescale the image
         target_width, target_height = 28, 28
@@ -111,14 +441,14 @@ class Detection:
 
         # pad the image
         h, w = image.shape
-        pad_horizontal = target_width - w 
-        pad_vertical = target_height - h
-        pad_left = pad_horizontal // 2
-        pad_right = pad_horizontal - pad_left
-        pad_top = pad_vertical // 2
-        pad_bottom = pad_vertical - pad_top
-        image = np.pad(image, ((pad_top, pad_bottom), (pad_left, pad_right)))
-        return image
+        pad_left = (target_width - w) // 2
+        pad_top = (target_height - h) // 2
+        if out is None:
+            out = np.zeros((target_height, target_width))
+        else:
+            out[...] = 0
+        out[pad_top:pad_top + h, pad_left:pad_left + w] = image
+        return out
 
     @staticmethod
     def preprocess_box_region(image: np.ndarray) -> np.ndarray:
@@ -132,3 +462,77 @@ class Detection:
 
         return image 
 
+
+
+class IncrementalDetection:
+    """Reads captures of the same board again and again, inferring only the boxes which changed.
+
+    The thresholds of the last full scan are kept, with the thresholded crop each box was last
+    inferred from. A new capture is thresholded with the same thresholds and every
+    crop compared with the one kept. Boxes where more than the tolerance of the pixels differ are
+    inferred again, and the others keep their inferences. The board is scanned in full again when
+    its size changes, or when at least half of the boxes changed, such as for a new game.
+    """
+    def __init__(self: 'IncrementalDetection', tolerance: float = 0.01, reconcile: bool = True) -> None:
+        """Creates a detection which has not seen any board yet.
+
+        Parameters
+        ----------
+        tolerance: float
+            The fraction of the pixels of a box which may differ before it is inferred again.
+        reconcile: bool
+            See Detection.scan.
+        """
+        self.tolerance = tolerance
+        self.reconcile = reconcile
+        self.reset()
+
+    def reset(self: 'IncrementalDetection') -> None:
+        """Forgets the last board, so that the next capture is scanned in full."""
+        self.shape = self.thresholds = None # size and thresholds of the board at the last full scan
+        self.crops = None # crop each box was last inferred from
+        self.cells = None # inferences of every box, as stored in CELL_CACHE
+
+    def changed(self: 'IncrementalDetection', crops: list[np.ndarray]) -> list[int]:
+        """Returns the indices of the crops which differ from those kept by more than the tolerance."""
+        return [k for k, (crop, kept) in enumerate(zip(crops, self.crops))
+                if crop.shape != kept.shape or np.count_nonzero(crop != kept) > self.tolerance * crop.size]
+
+    def scan(self: 'IncrementalDetection', screen: np.ndarray, stats: dict | None = None) -> DetectionResult:
+        """Returns the inferences made on the screenshot of the board, as Detection.scan does.
+
+        Parameters
+        ----------
+        screen: np.ndarray
+            The screenshot of the board.
+        stats: dict | None
+            If given, 'reused_boxes' is increased by the number of boxes which kept their inferences,
+            'full_scans' by one if the board was scanned in full, and the others as in Detection.scan.
+        """
+        gray = skimage.color.rgb2gray(np.asarray(screen))
+        changed = None
+        if self.crops is not None and gray.shape == self.shape:
+            regions = Detection.threshold(gray, self.thresholds)
+            crops = Detection.crop_cells(regions)
+            changed = self.changed(crops)
+
+        if changed is None or 2 * len(changed) >= len(crops):
+            self.shape, self.thresholds = gray.shape, skimage.filters.threshold_multiotsu(gray)
+            regions = Detection.threshold(gray, self.thresholds)
+            self.crops = Detection.crop_cells(regions)
+            self.cells = Detection.infer(regions, range(len(self.crops)), stats)
+            changed = range(len(self.crops))
+            if stats is not None:
+                stats['full_scans'] = stats.get('full_scans', 0) + 1
+        elif changed:
+            cells = Detection.infer(regions, changed, stats)
+            for k in changed:
+                self.crops[k], self.cells[k] = crops[k], cells[k]
+
+        if stats is not None:
+            stats['reused_boxes'] = stats.get('reused_boxes', 0) + len(self.crops) - len(changed)
+        return Detection.collect(self.cells, self.reconcile, stats)
+
+    def process_board(self: 'IncrementalDetection', screen: np.ndarray, stats: dict | None = None) -> tuple[list]:
+        """Returns the board, sums, top, bottom, left and right borders of IncrementalDetection.scan."""
+        return self.scan(screen, stats).data()
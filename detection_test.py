@@ -0,0 +1,226 @@
+"""Usage: python -m pytest"""
+
+import numpy as np
+import pytest
+import skimage
+import detection
+import prediction
+from cache import ImageCache
+from detection import Detection, DetectionResult, IncrementalDetection, Blob, DIGIT, SUM
+
+
+def board(size: int = 452, seed: int = 0) -> np.ndarray:
+    """Returns a thresholded image of a board with grid lines, dashed groups, digits and sums."""
+    rng = np.random.default_rng(seed)
+    image = np.zeros((size, size), dtype=int)
+    step = size / 9
+    for k in range(10):
+        line = min(size - 1, int(k * step))
+        width = 3 if k % 3 == 0 else 1
+        image[max(0, line - width // 2):line + width // 2 + 1, :] = 255
+        image[:, max(0, line - width // 2):line + width // 2 + 1] = 255
+    for i in range(9):
+        for j in range(9):
+            top, left = int(i * step), int(j * step)
+            if rng.random() < 0.5:
+                # dashed outline of a group and a sum shaped like an L
+                for t in range(5, int(step) - 5, 6):
+                    image[top + 5, left + t:left + t + 3] = 255
+                    image[top + t:top + t + 3, left + 5] = 255
+                image[top + 8:top + 15, left + 9] = 255
+                image[top + 14, left + 9:left + 13] = 255
+            if rng.random() < 0.4:
+                # digit shaped like a 7
+                image[top + 12, left + 18:left + 32] = 255
+                image[top + 12:top + 40, left + 31:left + 33] = 255
+    return image
+
+
+# ========== crop_windows() ==========
+def test_crop_windows_1():
+    """Test description: matches the crops of every box"""
+    regions = board()
+    windows = Detection.crop_windows(regions.shape)
+    assert len(windows) == 81
+    assert windows[0].tolist() == [0, 0, 55, 55]
+    for (top, left, bottom, right), crop in zip(windows, Detection.crop_cells(regions)):
+        assert crop.shape == (bottom - top, right - left)
+
+# ========== classify() ==========
+def test_classify_1():
+    """Test description: digit in the center, sum in the top left corner and grid line"""
+    bboxes = np.array([[15, 20, 40, 30], [5, 5, 12, 9], [0, 0, 2, 55]])
+    areas = np.array([60, 14, 110])
+    assert Detection.classify(bboxes, areas, 55, 55).tolist() == [DIGIT, SUM, 0]
+
+# ========== extract_board() ==========
+@pytest.mark.parametrize('size', [452, 450, 397])
+def test_extract_board_1(size):
+    """Test description: same images as extracting every crop on its own"""
+    regions = board(size)
+    boxes, kinds, digits = Detection.extract_board(regions)
+    assert len(digits) == sum(len(x) for x in kinds) > 0
+    start = 0
+    for k, crop in enumerate(Detection.crop_cells(regions)):
+        box, expected_kinds, expected_digits = Detection.extract(crop)
+        assert np.array_equal(box, boxes[k])
+        assert expected_kinds == kinds[k]
+        assert np.array_equal(expected_digits, digits[start:start + len(kinds[k])])
+        start += len(kinds[k])
+
+# ========== preprocess_digit_region() ==========
+def test_preprocess_digit_region_1():
+    """Test description: result is written into the slot given"""
+    crop = Detection.crop_cells(board())[1]
+    kinds, digits = Detection.extract(crop)[1:]
+    zones = skimage.measure.label(crop, connectivity=1)
+    bboxes, areas = Detection.components(zones)
+    n = np.flatnonzero(Detection.classify(bboxes, areas, *crop.shape) == SUM)[0]
+    batch = np.full((2, 28, 28), 7.0)
+    out = Detection.preprocess_digit_region(zones, Blob(zones, n + 1, tuple(bboxes[n]), areas[n]), out=batch[1])
+    assert np.shares_memory(out, batch)
+    assert kinds[0] == 'sum' and np.array_equal(batch[1], digits[0])
+    assert (batch[0] == 7).all()
+
+def screen(seed: int = 0) -> np.ndarray:
+    """Returns a screenshot of the board of board(seed=seed)."""
+    image = np.where(board(seed=seed)[..., None] > 0, 20, 245).astype(np.uint8).repeat(3, axis=-1)
+    image[200:260, 300:360] = 150
+    return image
+
+
+# ========== DetectionResult ==========
+def test_confidence_1():
+    """Test description: least certain border or digit of each box"""
+    cells = [Detection.cell([0.99, 0.01, 0.99, 0.01], [], []) for _ in range(81)]
+    cells[10] = Detection.cell([0.99, 0.3, 0.99, 0.01], [], [])
+    cells[20] = Detection.cell([0.99, 0.01, 0.99, 0.01], ['sum', 'digit'], np.eye(10)[[1, 7]] * 0.8)
+    result = Detection.collect(cells, reconcile=False)
+    assert result.sums[2][2] == 1 and result.board[2][2] == '7'
+    assert np.allclose(result.confidence()[[0, 1, 2], [0, 1, 2]], [0.99, 0.7, 0.8])
+    assert result.uncertain(0.9) == [(1, 1), (2, 2)]
+
+# ========== process_board() ==========
+def test_process_board_1(monkeypatch):
+    """Test description: repeated scans skip inference"""
+    calls = []
+    monkeypatch.setattr(prediction.Predictor, 'backend', 'numpy')
+    for name in ('digit_probabilities', 'border_probabilities'):
+        method = getattr(prediction.Predictor, name)
+        monkeypatch.setattr(prediction.Predictor, name, lambda images, method=method: calls.append(len(images)) or method(images))
+    monkeypatch.setattr(detection, 'CELL_CACHE', ImageCache())
+    monkeypatch.setattr(detection, 'BOARD_CACHE', ImageCache())
+
+    stats = {}
+    first = Detection.process_board(screen(), stats=stats)
+    assert stats['boxes'] == 81
+    assert len(calls) == 2
+    calls.clear()
+    assert Detection.process_board(screen()) == first
+    assert calls == []
+
+    # a new board sharing every box with the first one
+    detection.BOARD_CACHE.clear()
+    assert Detection.process_board(screen()) == first
+    assert calls == []
+
+def test_process_board_3(monkeypatch):
+    """Test description: repaired borders are counted"""
+    monkeypatch.setattr(prediction.Predictor, 'backend', 'numpy')
+    monkeypatch.setattr(detection, 'CELL_CACHE', ImageCache())
+    monkeypatch.setattr(detection, 'BOARD_CACHE', ImageCache())
+    stats = {}
+    found = np.array(Detection.process_board(screen(), reconcile=False)[2:])
+    repaired = np.array(Detection.process_board(screen(), stats=stats)[2:])
+    assert stats['repaired_sides'] == np.count_nonzero(found != repaired)
+
+def test_process_board_4(monkeypatch, tmp_path):
+    """Test description: entries of an earlier cache format on disk are not read"""
+    monkeypatch.setattr(prediction.Predictor, 'backend', 'numpy')
+    monkeypatch.setattr(detection, 'CELL_CACHE', ImageCache())
+    monkeypatch.setattr(detection, 'BOARD_CACHE', ImageCache())
+    expected = Detection.process_board(screen())
+
+    # the bare output of each box and the six arrays of the board, keyed without a format
+    cells, boards = ImageCache(directory=tmp_path / 'cells'), ImageCache(directory=tmp_path / 'boards')
+    fingerprint = prediction.Predictor.fingerprint()
+    for crop in Detection.crop_cells(Detection.preprocess_board(screen())):
+        cells.put(ImageCache.key(crop, fingerprint), ['', 0, True, True, True, True])
+    boards.put(ImageCache.key(screen(), fingerprint, True), [[['']] * 9] * 6)
+    monkeypatch.setattr(detection, 'CELL_CACHE', ImageCache(directory=tmp_path / 'cells'))
+    monkeypatch.setattr(detection, 'BOARD_CACHE', ImageCache(directory=tmp_path / 'boards'))
+    assert Detection.process_board(screen()) == expected
+    assert detection.CELL_CACHE.hits == detection.BOARD_CACHE.hits == 0
+
+def test_scan_1(monkeypatch):
+    """Test description: process_board returns the data of the result"""
+    monkeypatch.setattr(prediction.Predictor, 'backend', 'numpy')
+    monkeypatch.setattr(detection, 'CELL_CACHE', ImageCache())
+    monkeypatch.setattr(detection, 'BOARD_CACHE', ImageCache())
+    result = Detection.scan(screen())
+    assert isinstance(result, DetectionResult)
+    assert np.array(result.borders).shape == (9, 9, 4)
+    assert Detection.process_board(screen()) == result.data()
+    assert Detection.scan(screen()) == result
+
+# ========== refine() ==========
+def test_refine_1(monkeypatch):
+    """Test description: only uncertain boxes are inferred again, in one pass per model"""
+    calls = []
+    monkeypatch.setattr(prediction.Predictor, 'backend', 'numpy')
+    for name in ('digit_probabilities', 'border_probabilities'):
+        method = getattr(prediction.Predictor, name)
+        monkeypatch.setattr(prediction.Predictor, name, lambda images, method=method: calls.append(len(images)) or method(images))
+    monkeypatch.setattr(detection, 'CELL_CACHE', ImageCache())
+    monkeypatch.setattr(detection, 'BOARD_CACHE', ImageCache())
+    result = Detection.scan(screen())
+    calls.clear()
+    assert Detection.refine(screen(), result, threshold=0) is result
+    assert calls == []
+
+    stats = {}
+    refined = Detection.refine(screen(), result, threshold=1.01, scale=1, stats=stats)
+    assert stats['refined_boxes'] == 81
+    assert len(calls) == 2 and calls[0] == 81 * 5
+    assert refined.confidence().shape == (9, 9)
+
+# ========== IncrementalDetection ==========
+def test_incremental_detection_1(monkeypatch):
+    """Test description: only the boxes which changed are inferred again"""
+    monkeypatch.setattr(prediction.Predictor, 'backend', 'numpy')
+    monkeypatch.setattr(detection, 'CELL_CACHE', ImageCache())
+    monkeypatch.setattr(detection, 'BOARD_CACHE', ImageCache())
+    incremental = IncrementalDetection()
+    stats = {}
+    assert incremental.process_board(screen(), stats) == Detection.process_board(screen())
+    assert (stats['full_scans'], stats['boxes'], stats['reused_boxes']) == (1, 81, 0)
+
+    # a digit entered in (4, 4) and a highlighted box (2, 7)
+    image = screen()
+    image[215:238, 224:228] = 20
+    highlight = image[105:146, 356:397]
+    highlight[highlight == 245] = 220
+    stats = {}
+    data = incremental.process_board(image, stats)
+    assert (stats.get('full_scans', 0), stats['boxes'], stats['reused_boxes']) == (0, 1, 80)
+    detection.CELL_CACHE.clear()
+    detection.BOARD_CACHE.clear()
+    assert data == Detection.process_board(image)
+
+def test_incremental_detection_2(monkeypatch):
+    """Test description: a new game or size is scanned in full"""
+    monkeypatch.setattr(prediction.Predictor, 'backend', 'numpy')
+    monkeypatch.setattr(detection, 'CELL_CACHE', ImageCache())
+    monkeypatch.setattr(detection, 'BOARD_CACHE', ImageCache())
+    incremental = IncrementalDetection()
+    incremental.scan(screen())
+    other = screen(seed=1)
+    stats = {}
+    assert incremental.process_board(other, stats) == Detection.process_board(other)
+    incremental.scan(screen()[:400, :400], stats)
+    assert (stats['full_scans'], stats['reused_boxes']) == (2, 0)
+
+    incremental.reset()
+    stats = {}
+    incremental.scan(screen()[:400, :400], stats)
+    assert stats['full_scans'] == 1
@@ -0,0 +1,163 @@
+"""This module runs detection and solving on image files, without a display or any interaction."""
+
+from typing import Iterable, Iterator, NamedTuple
+import argparse
+import pathlib
+import json
+import glob
+import time
+import sys
+import os
+import numpy as np
+import PIL.Image
+
+from detection import Detection
+from locator import BoardLocator
+from puzzle import Puzzle
+from solver import SOLVERS
+import serialization
+import prediction
+import batch
+
+
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.webp'}
+
+
+class IngestResult(NamedTuple):
+    """The outcome of reading the game in one image.
+
+    Attributes
+    ----------
+    path: str
+        The image file.
+    status: str
+        One of 'solved', 'unsolvable' (invalid parameters or no solution), 'detected' (not solved),
+        'not found' (no board in the image) or 'error'.
+    region: tuple[int, int, int, int] | None
+        The top, left, bottom and right edges of the board in the image, if found.
+    data: tuple[list] | None
+        The six arrays returned by Detection.process_board, if the board was found.
+    solution: list[list[str]] | None
+        The solved board, if the game was solved.
+    error: str | None
+        The exception raised while reading or solving the game, if any.
+    elapsed: float
+        The number of seconds spent on the image.
+    """
+    path: str
+    status: str
+    region: tuple[int, int, int, int] | None
+    data: tuple[list] | None
+    solution: list[list[str]] | None
+    error: str | None
+    elapsed: float
+
+
+def expand(sources: Iterable[str | os.PathLike]) -> list[pathlib.Path]:
+    """Returns the image files given by paths to files or directories, or by glob patterns.
+    The images of a directory or pattern are sorted, and each file is only returned once."""
+    paths = []
+    for source in sources:
+        source = str(source)
+        if os.path.isdir(source):
+            matches = sorted(path for path in pathlib.Path(source).iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+        elif glob.has_magic(source):
+            matches = sorted(pathlib.Path(path) for path in glob.glob(source, recursive=True)
+                             if pathlib.Path(path).suffix.lower() in IMAGE_SUFFIXES)
+        else:
+            matches = [pathlib.Path(source)]
+        paths.extend(path for path in matches if path not in paths)
+    return paths
+
+
+def load_image(path: str | os.PathLike) -> np.ndarray:
+    """Returns the RGB pixels of an image file."""
+    with PIL.Image.open(path) as image:
+        return np.asarray(image.convert('RGB'))
+
+
+def ingest_one(path: str | os.PathLike, solve: bool = True, solver: str = 'bitmask', timeout: float | None = None, 
+               locator: BoardLocator | None = None) -> IngestResult:
+    """Reads, and solves, the game in an image file. Exceptions are captured in the result.
+
+    Parameters
+    ----------
+    path: str | os.PathLike
+        The image file.
+    solve: bool
+        If False, the game is only detected.
+    solver: str
+        The name of the solver in solver.SOLVERS.
+    timeout: float | None
+        The number of seconds allowed for solving.
+    locator: BoardLocator | None
+        The locator finding the board, which checks the region of the previous image first.
+        If None, the whole image is searched.
+
+    Returns
+    -------
+    result: IngestResult
+        The outcome of reading the game.
+    """
+    start = time.perf_counter()
+    try:
+        screen = load_image(path)
+        region = (locator or BoardLocator()).locate(screen)
+        if region is None:
+            return IngestResult(str(path), 'not found', None, None, None, None, time.perf_counter() - start)
+        top, left, bottom, right = region
+        data = Detection.process_board(screen[top:bottom, left:right])
+    except Exception as e:
+        return IngestResult(str(path), 'error', None, None, None, f'{type(e).__name__}: {e}', time.perf_counter() - start)
+    if not solve:
+        return IngestResult(str(path), 'detected', region, data, None, None, time.perf_counter() - start)
+    result = batch.solve_one((0, data, solver, timeout))
+    return IngestResult(str(path), result.status, region, data, result.solution, result.error, time.perf_counter() - start)
+
+
+def ingest_many(
+        sources: Iterable[str | os.PathLike],
+        solve: bool = True,
+        solver: str = 'bitmask',
+        timeout: float | None = None
+        ) -> Iterator[IngestResult]:
+    """Reads, and solves, the games in many image files, given as for expand. Results are yielded
+    in the order of the files, as soon as each is read. Screenshots taken the same way usually 
+    show the board at the same place, so the region found in one image is checked first in the 
+    next. See ingest_one for the parameters."""
+    if solver not in SOLVERS:
+        raise ValueError(f'unknown solver {solver!r}, expected one of {list(SOLVERS)}')
+    locator = BoardLocator()
+    for path in expand(sources):
+        yield ingest_one(path, solve, solver, timeout, locator)
+
+
+def format_text(result: IngestResult) -> str:
+    """Returns the result in the text format of the serialization module, after a comment line with the
+    file and status. The digits are those of the solution if the game was solved."""
+    lines = [f'# {result.path}: {result.status}' + (f' ({result.error})' if result.error else '')]
+    if result.data is not None:
+        board = result.data[0] if result.solution is None else result.solution
+        try:
+            lines.append(serialization.format_line(Puzzle.from_tuple((board, *result.data[1:]))))
+        except ValueError as e:
+            lines.append(f'# {e}')
+    return '\n'.join(lines)
+
+
+# ========== command line interface ==========
+def run(args: argparse.Namespace) -> int:
+    """Runs the scan subcommand, with the arguments defined in main. Returns the exit code, 1 if a board could not be read."""
+    if args.backend is not None:
+        prediction.Predictor.use(args.backend)
+    target = sys.stdout if args.output == '-' else open(args.output, 'w')
+    code = 0
+    try:
+        for result in ingest_many(args.inputs, not args.no_solve, args.solver, args.timeout):
+            if result.data is None:
+                code = 1
+            target.write((json.dumps(result._asdict()) if args.format == 'json' else format_text(result)) + '\n')
+    finally:
+        if target is not sys.stdout:
+            target.close()
+    return code
@@ -0,0 +1,85 @@
+"""Usage: python -m pytest"""
+
+import json
+import numpy as np
+import PIL.Image
+import pytest
+import detection
+import prediction
+import serialization
+from cache import ImageCache
+from ingest import IngestResult, expand, ingest_many, format_text
+from main import main
+from detection_test import board
+from solver_2_test import board as digits, sums, top_border, bottom_border, left_border, right_border, solution
+
+
+def window(top: int = 80, left: int = 120) -> np.ndarray:
+    """Returns a screenshot of a window with a toolbar, a button and the board of detection_test at (top, left)."""
+    image = np.full((top + 560, left + 560, 3), 235, dtype=np.uint8)
+    image[:30] = 60
+    image[40:70, 10:100] = 30
+    image[top:top + 452, left:left + 452] = np.where(board()[..., None] > 0, 20, 245)
+    image[top + 200:top + 260, left + 300:left + 360] = 150
+    return image
+
+
+@pytest.fixture
+def numpy_backend(monkeypatch):
+    """Runs the models with numpy, with empty caches."""
+    monkeypatch.setattr(prediction.Predictor, 'backend', 'numpy')
+    monkeypatch.setattr(detection, 'CELL_CACHE', ImageCache())
+    monkeypatch.setattr(detection, 'BOARD_CACHE', ImageCache())
+
+# ========== expand() ==========
+def test_expand_1(tmp_path):
+    """Test description: files, directories and patterns"""
+    for name in ('b.png', 'a.JPG', 'notes.txt'):
+        (tmp_path / name).touch()
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'c.png').touch()
+    assert expand([tmp_path]) == [tmp_path / 'a.JPG', tmp_path / 'b.png']
+    assert expand([str(tmp_path / '**' / '*.png')]) == [tmp_path / 'b.png', tmp_path / 'sub' / 'c.png']
+    assert expand([tmp_path / 'b.png', tmp_path]) == [tmp_path / 'b.png', tmp_path / 'a.JPG']
+
+# ========== ingest_many() ==========
+def test_ingest_many_1(tmp_path, numpy_backend):
+    """Test description: detected, missing board and unreadable file"""
+    PIL.Image.fromarray(window()).save(tmp_path / 'game.png')
+    PIL.Image.fromarray(np.full((200, 200, 3), 200, dtype=np.uint8)).save(tmp_path / 'blank.png')
+    (tmp_path / 'broken.png').write_text('not an image')
+    results = {result.path: result for result in ingest_many([tmp_path], solve=False)}
+    game = results[str(tmp_path / 'game.png')]
+    assert (game.status, game.region) == ('detected', (80, 120, 532, 572))
+    assert game.data == detection.Detection.process_board(window()[80:532, 120:572])
+    assert results[str(tmp_path / 'blank.png')].status == 'not found'
+    assert results[str(tmp_path / 'broken.png')].status == 'error'
+
+def test_ingest_many_2():
+    """Test description: unknown solver"""
+    with pytest.raises(ValueError):
+        next(ingest_many([], solver='random'))
+
+# ========== format_text() ==========
+def test_format_text_1():
+    """Test description: solution in the text format"""
+    data = (digits, sums, top_border, bottom_border, left_border, right_border)
+    lines = format_text(IngestResult('a.png', 'solved', (0, 0, 9, 9), data, solution, None, 0.1)).split('\n')
+    assert lines[0] == '# a.png: solved'
+    assert serialization.parse_line(lines[1]).to_tuple()[0] == solution
+
+def test_format_text_2():
+    """Test description: borders which are not a layout of groups"""
+    data = (digits, sums, [[False] * 9] * 9, bottom_border, left_border, right_border)
+    lines = format_text(IngestResult('a.png', 'unsolvable', (0, 0, 9, 9), data, None, None, 0.1)).split('\n')
+    assert len(lines) == 2 and lines[1].startswith('# ')
+
+# ========== command line interface ==========
+def test_main_1(tmp_path, numpy_backend):
+    """Test description: scan subcommand writes one JSON result per image"""
+    PIL.Image.fromarray(window()).save(tmp_path / 'game.png')
+    output = tmp_path / 'results.jsonl'
+    assert main(['scan', str(tmp_path / '*.png'), '--no-solve', '-o', str(output)]) == 0
+    result = json.loads(output.read_text())
+    assert (result['status'], result['region']) == ('detected', [80, 120, 532, 572])
+    assert main(['scan', str(tmp_path / 'missing.png'), '-o', str(output)]) == 1
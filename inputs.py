@@ -0,0 +1,234 @@
+"""This module enters a solution into the game as a stream of clicks and key presses, sent by an input backend.
+
+The solution is entered by InputScheduler, which skips the given positions, visits the others
+along a short path and moves between neighbouring positions with the arrow keys, so that the 
+solution is typed as a few clicks, each followed by a sequence of keys.
+
+The events are sent by one of the backends in INPUT_BACKENDS:
+
+pyautogui: sends the events with pyautogui, pausing for a configurable time between them.
+pynput: sends the events with the mouse and keyboard controllers of pynput.
+recorder: records the events with the simulated time each would be sent at, for dry runs,
+          tests and benchmarks.
+
+The backend is chosen with the KILLER_SUDOKU_INPUT environment variable, and defaults to pyautogui.
+No backend needs a display until it sends an event.
+"""
+
+from typing import Iterable, NamedTuple
+import time
+import abc
+import os
+
+from config import *
+
+
+class Event(NamedTuple):
+    """An input event - a click at (x, y), or a sequence of key presses given by their pyautogui names."""
+    kind: str # 'click' or 'keys'
+    value: tuple[int, int] | list[str]
+
+
+# ========== backends ==========
+class InputBackend(abc.ABC):
+    """Sends events to the game. Subclasses implement click and press."""
+    def __init__(self: 'InputBackend', pause: float = 0.01) -> None:
+        """Creates a backend which waits pause seconds after every click and key press."""
+        self.pause = pause
+
+    @abc.abstractmethod
+    def click(self: 'InputBackend', x: int, y: int) -> None:
+        """Clicks at (x, y) on the screen."""
+
+    @abc.abstractmethod
+    def press(self: 'InputBackend', keys: list[str]) -> None:
+        """Presses the keys in order, given by their pyautogui names."""
+
+    def send(self: 'InputBackend', events: Iterable[Event]) -> None:
+        """Sends the events in order."""
+        for event in events:
+            if event.kind == 'click':
+                self.click(*event.value)
+            elif event.kind == 'keys':
+                self.press(event.value)
+            else:
+                raise ValueError(f'unknown event {event.kind!r}')
+
+
+class PyAutoGuiInput(InputBackend):
+    """Sends the events with pyautogui, in place of its default pause of 0.1 seconds after every call."""
+    def click(self: 'PyAutoGuiInput', x: int, y: int) -> None:
+        import pyautogui
+        pyautogui.click(x, y, _pause=False)
+        time.sleep(self.pause)
+
+    def press(self: 'PyAutoGuiInput', keys: list[str]) -> None:
+        import pyautogui
+        pyautogui.press(keys, interval=self.pause, _pause=False)
+
+
+class PynputInput(InputBackend):
+    """Sends the events with the mouse and keyboard controllers of pynput."""
+    def __init__(self: 'PynputInput', pause: float = 0.01) -> None:
+        super().__init__(pause)
+        self.mouse = self.keyboard = None
+
+    def connect(self: 'PynputInput') -> None:
+        """Creates the controllers the first time an event is sent."""
+        if self.mouse is None:
+            from pynput import mouse, keyboard
+            self.mouse, self.keyboard = mouse.Controller(), keyboard.Controller()
+            self.button, self.special = mouse.Button.left, keyboard.Key
+
+    def click(self: 'PynputInput', x: int, y: int) -> None:
+        self.connect()
+        self.mouse.position = (x, y)
+        self.mouse.click(self.button)
+        time.sleep(self.pause)
+
+    def press(self: 'PynputInput', keys: list[str]) -> None:
+        self.connect()
+        for key in keys:
+            # named keys, such as the arrows, are members of Key and characters are typed as they are
+            self.keyboard.tap(getattr(self.special, key) if len(key) > 1 else key)
+            time.sleep(self.pause)
+
+
+class TimedEvent(NamedTuple):
+    """A single click or key press recorded by RecordingInput, at the simulated time it would be sent."""
+    time: float
+    kind: str # 'click' or 'key'
+    value: tuple[int, int] | str
+
+
+class RecordingInput(InputBackend):
+    """Records the events instead of sending them.
+
+    Every click and key press is timestamped with a simulated clock, which advances by the pause
+    and by latency, the time the system takes to deliver an event, after each of them.
+    """
+    def __init__(self: 'RecordingInput', pause: float = 0.01, latency: float = 0) -> None:
+        super().__init__(pause)
+        self.latency = latency
+        self.events = [] # events sent
+        self.timeline = [] # single clicks and key presses, as TimedEvent
+        self.clock = 0.0
+
+    @property
+    def elapsed(self: 'RecordingInput') -> float:
+        """The simulated number of seconds taken by the events recorded."""
+        return self.clock
+
+    def record(self: 'RecordingInput', kind: str, value: tuple[int, int] | str) -> None:
+        self.timeline.append(TimedEvent(self.clock, kind, value))
+        self.clock += self.latency + self.pause
+
+    def click(self: 'RecordingInput', x: int, y: int) -> None:
+        self.events.append(Event('click', (x, y)))
+        self.record('click', (x, y))
+
+    def press(self: 'RecordingInput', keys: list[str]) -> None:
+        self.events.append(Event('keys', list(keys)))
+        for key in keys:
+            self.record('key', key)
+
+
+INPUT_BACKENDS = {'pyautogui': PyAutoGuiInput, 'pynput': PynputInput, 'recorder': RecordingInput}
+DEFAULT_INPUT = os.environ.get('KILLER_SUDOKU_INPUT') or 'pyautogui'
+
+
+def input_backend(name: str | None = None, pause: float = 0.01) -> InputBackend:
+    """Creates the backend with the given name in INPUT_BACKENDS, or the default one."""
+    name = DEFAULT_INPUT if name is None else name
+    if name not in INPUT_BACKENDS:
+        raise ValueError(f'unknown input backend {name!r}, expected one of {list(INPUT_BACKENDS)}')
+    return INPUT_BACKENDS[name](pause)
+
+
+# ========== scheduling ==========
+class InputScheduler:
+    """Plans the events entering a solution."""
+    ORDERS = ('serpentine', 'row-major')
+    NAVIGATIONS = ('auto', 'arrows', 'click')
+
+    @staticmethod
+    def moves(solution: list[list[str]], board: list[list[str]] | None = None, order: str = 'serpentine') -> list[tuple[int, int, str]]:
+        """Returns the row, column and digit of every position to fill, in the order they are entered.
+
+        Parameters
+        ----------
+        solution: list[list[str]]
+            The solved board.
+        board: list[list[str]] | None
+            The board before solving. Its given positions are skipped. If None, every position is filled.
+        order: str
+            'serpentine' goes left to right on even rows and right to left on odd rows, so that
+            every move is to a neighbouring position. 'row-major' goes left to right on every row.
+        """
+        if order not in InputScheduler.ORDERS:
+            raise ValueError(f'unknown order {order!r}, expected one of {list(InputScheduler.ORDERS)}')
+        moves = []
+        for i in range(SUDOKU_SIZE):
+            columns = range(SUDOKU_SIZE) if order == 'row-major' or i % 2 == 0 else reversed(range(SUDOKU_SIZE))
+            for j in columns:
+                if board is None or board[i][j] == '':
+                    moves.append((i, j, str(solution[i][j])))
+        return moves
+
+    @staticmethod
+    def events(moves: list[tuple[int, int, str]], centers: list[list[list[int]]], navigation: str = 'auto') -> list[Event]:
+        """Returns the events entering the moves.
+
+        Parameters
+        ----------
+        moves: list[tuple[int, int, str]]
+            The moves returned by InputScheduler.moves.
+        centers: list[list[list[int]]]
+            The screen coordinates of the center of every box, as returned by Controller.calculate_box_centers.
+        navigation: str
+            'arrows' clicks the first position and reaches every other one with the arrow keys, so
+            the digits and arrows are pressed as one sequence. 'click' clicks every position. 'auto'
+            uses an arrow key to reach a neighbouring position and a click to reach any other, which
+            takes the fewest clicks and key presses.
+        """
+        if navigation not in InputScheduler.NAVIGATIONS:
+            raise ValueError(f'unknown navigation {navigation!r}, expected one of {list(InputScheduler.NAVIGATIONS)}')
+        events, keys, previous = [], [], None
+        for i, j, digit in moves:
+            distance = None if previous is None else abs(i - previous[0]) + abs(j - previous[1])
+            if distance is None or navigation == 'click' or (navigation == 'auto' and distance > 1):
+                if keys:
+                    events.append(Event('keys', keys))
+                events.append(Event('click', tuple(centers[i][j])))
+                keys = []
+            else:
+                r, c = previous
+                keys += ['down' if i > r else 'up'] * abs(i - r) + ['right' if j > c else 'left'] * abs(j - c)
+            keys.append(digit)
+            previous = (i, j)
+        if keys:
+            events.append(Event('keys', keys))
+        return events
+
+    @staticmethod
+    def enter(backend: InputBackend, solution: list[list[str]], centers: list[list[list[int]]], board: list[list[str]] | None = None,
+              order: str = 'serpentine', navigation: str = 'auto') -> list[Event]:
+        """Enters a solution with the backend, and returns the events sent. See InputScheduler.moves
+        and InputScheduler.events for the parameters."""
+        events = InputScheduler.events(InputScheduler.moves(solution, board, order), centers, navigation)
+        backend.send(events)
+        return events
+
+    @staticmethod
+    def benchmark(solution: list[list[str]], board: list[list[str]] | None = None, pause: float = 0.01, 
+                  latency: float = 0) -> dict[str, tuple[int, float]]:
+        """Returns the number of clicks and key presses, and the simulated number of seconds, needed to
+        enter a solution in every order and navigation, keyed by 'order/navigation'. See RecordingInput."""
+        centers = [[[j, i] for j in range(SUDOKU_SIZE)] for i in range(SUDOKU_SIZE)]
+        results = {}
+        for order in InputScheduler.ORDERS:
+            for navigation in InputScheduler.NAVIGATIONS:
+                backend = RecordingInput(pause, latency)
+                InputScheduler.enter(backend, solution, centers, board, order, navigation)
+                results[f'{order}/{navigation}'] = (len(backend.timeline), backend.elapsed)
+        return results
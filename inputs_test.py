@@ -0,0 +1,117 @@
+"""Usage: python -m pytest"""
+
+import sys
+import types
+import pytest
+from inputs import Event, InputBackend, InputScheduler, PyAutoGuiInput, PynputInput, RecordingInput, input_backend
+from solver_2_test import board, solution
+
+
+CENTERS = [[[10 * j + 5, 10 * i + 5] for j in range(9)] for i in range(9)]
+
+# ========== moves() ==========
+def test_moves_1():
+    """Test description: given positions are skipped"""
+    moves = InputScheduler.moves(solution, board)
+    assert len(moves) == sum(value == '' for row in board for value in row)
+    assert all(board[i][j] == '' and solution[i][j] == digit for i, j, digit in moves)
+
+def test_moves_2():
+    """Test description: serpentine order"""
+    moves = InputScheduler.moves(solution)
+    assert [(i, j) for i, j, _ in moves[7:11]] == [(0, 7), (0, 8), (1, 8), (1, 7)]
+    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(moves, moves[1:]))
+
+def test_moves_3():
+    """Test description: unknown order"""
+    with pytest.raises(ValueError):
+        InputScheduler.moves(solution, order='spiral')
+
+# ========== events() ==========
+def test_events_1():
+    """Test description: one click then arrows and digits"""
+    moves = [(0, 1, '3'), (0, 4, '5'), (2, 2, '7')]
+    assert InputScheduler.events(moves, CENTERS, 'arrows') == [
+        Event('click', (15, 5)),
+        Event('keys', ['3', 'right', 'right', 'right', '5', 'down', 'down', 'left', 'left', '7'])]
+
+def test_events_2():
+    """Test description: click on every position"""
+    events = InputScheduler.events([(0, 1, '3'), (2, 2, '7')], CENTERS, 'click')
+    assert events == [Event('click', (15, 5)), Event('keys', ['3']), Event('click', (25, 25)), Event('keys', ['7'])]
+    assert InputScheduler.events([], CENTERS) == []
+
+def test_events_3():
+    """Test description: arrows to neighbours and clicks elsewhere"""
+    moves = [(0, 1, '3'), (0, 2, '4'), (0, 5, '5'), (1, 5, '7')]
+    assert InputScheduler.events(moves, CENTERS) == [
+        Event('click', (15, 5)), Event('keys', ['3', 'right', '4']), Event('click', (55, 5)), Event('keys', ['5', 'down', '7'])]
+
+# ========== enter() ==========
+def test_enter_1():
+    """Test description: dry run records the event stream"""
+    backend = RecordingInput()
+    events = InputScheduler.enter(backend, solution, CENTERS, board)
+    assert backend.events == events
+    digits = [key for event in events if event.kind == 'keys' for key in event.value if key.isdigit()]
+    assert digits == [digit for _, _, digit in InputScheduler.moves(solution, board)]
+
+def test_enter_2(monkeypatch):
+    """Test description: pyautogui is called once per event without its default pause"""
+    calls = []
+    fake = types.SimpleNamespace(click=lambda *args, **kwargs: calls.append(('click', args, kwargs)),
+                                 press=lambda *args, **kwargs: calls.append(('press', args, kwargs)))
+    monkeypatch.setitem(sys.modules, 'pyautogui', fake)
+    events = InputScheduler.enter(PyAutoGuiInput(pause=0), solution, CENTERS, board, navigation='arrows')
+    assert [kind for kind, _, _ in calls] == ['click', 'press'] == [event.kind.replace('keys', 'press') for event in events]
+    assert all(kwargs['_pause'] is False for _, _, kwargs in calls)
+
+def test_enter_3(monkeypatch):
+    """Test description: pynput taps named keys and characters"""
+    calls = []
+    class Mouse:
+        def click(self, button): calls.append(('click', self.position, button))
+    class Keyboard:
+        def tap(self, key): calls.append(('tap', key))
+    mouse = types.SimpleNamespace(Controller=Mouse, Button=types.SimpleNamespace(left='left'))
+    keyboard = types.SimpleNamespace(Controller=Keyboard, Key=types.SimpleNamespace(right='<right>', down='<down>'))
+    monkeypatch.setitem(sys.modules, 'pynput', types.SimpleNamespace(mouse=mouse, keyboard=keyboard))
+    PynputInput(pause=0).send(InputScheduler.events([(0, 1, '3'), (0, 2, '4')], CENTERS))
+    assert calls == [('click', (15, 5), 'left'), ('tap', '3'), ('tap', '<right>'), ('tap', '4')]
+
+# ========== RecordingInput ==========
+def test_recording_input_1():
+    """Test description: every click and key press is timestamped"""
+    backend = RecordingInput(pause=0.01, latency=0.002)
+    backend.send([Event('click', (1, 2)), Event('keys', ['3', 'right'])])
+    assert [(kind, value) for _, kind, value in backend.timeline] == [('click', (1, 2)), ('key', '3'), ('key', 'right')]
+    assert [round(x.time, 6) for x in backend.timeline] == [0, 0.012, 0.024]
+    assert round(backend.elapsed, 6) == 0.036
+
+# ========== InputBackend ==========
+def test_input_backend_class_1():
+    """Test description: a backend must implement click and press"""
+    with pytest.raises(TypeError):
+        InputBackend()
+    class ClickOnly(InputBackend):
+        def click(self, x, y):
+            pass
+    with pytest.raises(TypeError):
+        ClickOnly()
+
+# ========== input_backend() ==========
+def test_input_backend_1():
+    """Test description: backends by name"""
+    assert isinstance(input_backend('recorder', 0.5), RecordingInput)
+    assert input_backend('pynput', 0.5).pause == 0.5
+    with pytest.raises(ValueError):
+        input_backend('xdotool')
+
+# ========== benchmark() ==========
+def test_benchmark_1():
+    """Test description: auto navigation takes the fewest events"""
+    results = InputScheduler.benchmark(solution, board)
+    assert set(results) == {f'{order}/{navigation}' for order in InputScheduler.ORDERS for navigation in InputScheduler.NAVIGATIONS}
+    events = {name: count for name, (count, _) in results.items()}
+    assert events['serpentine/auto'] == min(events.values())
+    assert events['serpentine/click'] == 2 * len(InputScheduler.moves(solution, board))
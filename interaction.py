@@ -1,34 +1,58 @@
-"""This module documents all interactions with the computer interface."""
+"""This module documents all interactions with the computer interface. pyautogui and pynput are only 
+imported when they are used, so that the module can be imported without a display."""
 import numpy as np
 import functools
-import pyautogui
-import pynput
 import time
-import PIL
+import PIL.Image
 
 
+from inputs import Event, InputBackend, InputScheduler, input_backend
+from locator import LOCATOR
 from config import *
 
 
 class Controller:
     @staticmethod
-    def act(context: dict, i: int, j: int, digit: str) -> None:
-        """Keys in the specified digit at the given box in the sudoku game."""
+    def act(context: dict, i: int, j: int, digit: str, backend: InputBackend | str | None = None) -> None:
+        """Keys in the specified digit at the given box in the sudoku game, with the input backend 
+        given or named in INPUT_BACKENDS."""
         assert context.get('box centers', None) is not None
         assert len(context['box centers']) == SUDOKU_SIZE and len(context['box centers'][i]) == SUDOKU_SIZE
         assert 0 <= i < SUDOKU_SIZE and 0 <= j < SUDOKU_SIZE
         assert digit in '123456789'
-        pyautogui.click(*context['box centers'][i][j])
-        pyautogui.write(digit)
+        backend = backend if isinstance(backend, InputBackend) else input_backend(backend)
+        backend.click(*context['box centers'][i][j])
+        backend.press([digit])
 
     @staticmethod
-    def implement_solution(context: dict, solution: list[list[str]]) -> None:
-        """Takes control over the mouse and keyboard to enter the solution into the sudoku board."""
+    def implement_solution(context: dict, solution: list[list[str]], backend: InputBackend | str | None = None, 
+                           order: str = 'serpentine', navigation: str = 'auto', pause: float = 0.01) -> list[Event]:
+        """Takes control over the mouse and keyboard to enter the solution into the sudoku board.
+
+        The given positions of context['data'], if any, are skipped, and the others are entered by 
+        InputScheduler. Returns the events sent.
+
+        Parameters
+        ----------
+        context: dict
+            The context of the game, with the 'box centers'.
+        solution: list[list[str]]
+            The solved board.
+        backend: InputBackend | str | None
+            The backend sending the events, or its name in INPUT_BACKENDS, such as 'recorder' for a 
+            dry run. Defaults to the backend chosen by KILLER_SUDOKU_INPUT.
+        order: str
+            The order the positions are entered in. See InputScheduler.moves.
+        navigation: str
+            How to move between positions. See InputScheduler.events.
+        pause: float
+            The number of seconds to wait after every event, if the backend is created from its name.
+        """
         assert len(solution) == SUDOKU_SIZE and len(solution[0]) == SUDOKU_SIZE
-        for i in range(SUDOKU_SIZE):
-            for j in range(SUDOKU_SIZE):
-                digit = solution[i][j]
-                Controller.act(context, i, j, digit)
+        assert context.get('box centers', None) is not None
+        board = context['data'][0] if context.get('data') is not None else None
+        backend = backend if isinstance(backend, InputBackend) else input_backend(backend, pause)
+        return InputScheduler.enter(backend, solution, context['box centers'], board, order, navigation)
 
     @staticmethod
     def calculate_box_dimensions(context: dict) -> None:
@@ -59,9 +83,10 @@ class Controller:
   
 class Screenshot:
     @staticmethod
-    def on_click(context: dict, x: int, y: int, button: pynput.mouse.Button, pressed: bool) -> None | bool:
+    def on_click(context: dict, x: int, y: int, button: 'pynput.mouse.Button', pressed: bool) -> None | bool:
         """Listener for detecting area selected by user. Records the position where the mouse was pressed 
         position where the mouse was released."""
+        import pynput
         # click detection
         if button == pynput.mouse.Button.left and pressed and not context.get('pressed', False): 
             context['top left'] = (x, y)
@@ -77,6 +102,8 @@ class Screenshot:
     @staticmethod
     def get_screenshot(context: dict) -> PIL.Image:
         """Returns a screenshot of area selected by the user."""
+        import pyautogui
+        import pynput
         # obtain region selected by user
         on_click_contextualised = functools.partial(Screenshot.on_click, context)
         with pynput.mouse.Listener(on_click=on_click_contextualised) as listener:
@@ -105,6 +132,7 @@ class Screenshot:
     @staticmethod
     def scan_sudoku_board(context: dict) -> PIL.Image:
         """Returns a image of the sudoku game board."""
+        import pyautogui
         # instruct the user on how to select region
         pyautogui.alert(text='Click and drag to outline the sudoku board.', title=context['title'], button='OK')
         time.sleep(1)
@@ -120,4 +148,17 @@ class Screenshot:
 
         # record screen    
         return screen
-    
+
+    @staticmethod
+    def locate_sudoku_board(context: dict) -> PIL.Image.Image | None:
+        """Returns an image of the sudoku game board found in a screenshot of the whole screen, and
+        records its region in the context as the user's selection would, or returns None if no board
+        is found. The region found last is checked first, so later scans are cheap."""
+        import pyautogui
+        screen = pyautogui.screenshot()
+        region = LOCATOR.locate(np.asarray(screen))
+        if region is None:
+            return None
+        LOCATOR.update(context, region)
+        top, left, bottom, right = region
+        return screen.crop((left, top, right, bottom))
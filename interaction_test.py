@@ -0,0 +1,27 @@
+"""Usage: python -m pytest"""
+
+from inputs import RecordingInput
+from interaction import Controller
+from solver_2_test import board, sums, top_border, bottom_border, left_border, right_border, solution
+
+
+def context() -> dict:
+    """Returns the context of a board selected at (100, 50), with boxes of 40 pixels."""
+    context = {'top left': (100, 50), 'width': 360, 'height': 360}
+    context['box centers'] = Controller.calculate_box_centers(context)
+    context['data'] = (board, sums, top_border, bottom_border, left_border, right_border)
+    return context
+
+# ========== act() ==========
+def test_act_1():
+    """Test description: clicks the box and types the digit"""
+    backend = RecordingInput()
+    Controller.act(context(), 2, 3, '7', backend)
+    assert [(kind, value) for _, kind, value in backend.timeline] == [('click', (240.0, 150.0)), ('key', '7')]
+
+# ========== implement_solution() ==========
+def test_implement_solution_1():
+    """Test description: dry run skips the givens"""
+    events = Controller.implement_solution(context(), solution, 'recorder')
+    digits = [key for event in events if event.kind == 'keys' for key in event.value if key.isdigit()]
+    assert len(digits) == sum(value == '' for row in board for value in row)
@@ -0,0 +1,125 @@
+"""This module finds the board in a screenshot of the whole screen or window, in place of selecting it by hand."""
+
+import threading
+import numpy as np
+import skimage
+import scipy.ndimage
+
+from detection import Detection
+
+
+class BoardLocator:
+    """Finds the board in screenshots, and remembers where it was found.
+
+    The thick lines of the grid are dark and connected, so the board is taken to be the largest
+    dark component which is nearly square, framed by lines along its four edges and mostly empty
+    inside. Searching a screenshot labels all of it, so the last region found is checked first,
+    by only looking at the bands along its edges, and the search only runs if the frame is gone.
+    """
+    band = 3 # width of the bands along the edges of the board where the frame is looked for
+    coverage = 0.9 # fraction of each edge the frame runs along
+
+    def __init__(self: 'BoardLocator', min_size: int = 100, max_ratio: float = 1.2) -> None:
+        """Creates a locator which has not found any board yet.
+
+        Parameters
+        ----------
+        min_size: int
+            The smallest width and height of the board, in pixels.
+        max_ratio: float
+            The largest ratio between the width and the height of the board.
+        """
+        self.min_size = min_size
+        self.max_ratio = max_ratio
+        self.region = None # last region found, as top, left, bottom and right edges
+        self.threshold = None # gray level below which pixels were dark in the last search
+        self.hits = self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def grayscale(screen: np.ndarray) -> np.ndarray:
+        """Returns the gray levels of an RGB, RGBA or grayscale image, between 0 and 1."""
+        screen = np.asarray(screen)
+        if screen.ndim == 3:
+            return skimage.color.rgb2gray(screen[..., :3])
+        return screen / 255 if screen.dtype == np.uint8 else screen.astype(float)
+
+    @classmethod
+    def framed(cls, dark: np.ndarray) -> bool:
+        """Returns whether dark pixels run along most of the four edges of an image."""
+        edges = [dark[:cls.band].any(axis=0), dark[-cls.band:].any(axis=0), dark[:, :cls.band].any(axis=1), dark[:, -cls.band:].any(axis=1)]
+        return min(edge.mean() for edge in edges) >= cls.coverage
+
+    def search(self: 'BoardLocator', screen: np.ndarray) -> tuple[tuple[int, int, int, int] | None, float | None]:
+        """Returns the region of the board in the whole image, or None if there is no board, and the
+        gray level below which pixels are dark."""
+        gray = self.grayscale(screen)
+        if gray.min() == gray.max():
+            return None, None
+        threshold = skimage.filters.threshold_otsu(gray)
+
+        # small gaps, such as where lighter lines cross the frame, are closed
+        dark = np.pad(gray < threshold, 2, mode='edge')
+        dark = scipy.ndimage.binary_closing(dark, np.ones((3, 3)))[2:-2, 2:-2]
+        zones = skimage.measure.label(dark, connectivity=2)
+        bboxes, areas = Detection.components(zones)
+
+        best = None
+        for n, (top, left, bottom, right) in enumerate(bboxes):
+            height, width = bottom - top, right - left
+            if (min(height, width) < self.min_size or max(height, width) > self.max_ratio * min(height, width) or
+                areas[n] > 0.5 * height * width):
+                continue
+            if not self.framed(zones[top:bottom, left:right] == n + 1):
+                continue
+            if best is None or height * width > (best[2] - best[0]) * (best[3] - best[1]):
+                best = (int(top), int(left), int(bottom), int(right))
+        return best, threshold
+
+    def verify(self: 'BoardLocator', screen: np.ndarray, region: tuple[int, int, int, int]) -> bool:
+        """Returns whether the frame of the board is still along the edges of the region. Only the
+        bands along the edges are converted to gray."""
+        screen = np.asarray(screen)
+        top, left, bottom, right = region
+        if bottom > screen.shape[0] or right > screen.shape[1] or self.threshold is None:
+            return False
+        band = self.band
+        dark = lambda pixels: self.grayscale(pixels) < self.threshold
+        edges = [dark(screen[top:top + band, left:right]).any(axis=0), dark(screen[bottom - band:bottom, left:right]).any(axis=0),
+                 dark(screen[top:bottom, left:left + band]).any(axis=1), dark(screen[top:bottom, right - band:right]).any(axis=1)]
+        return min(edge.mean() for edge in edges) >= self.coverage
+
+    def locate(self: 'BoardLocator', screen: np.ndarray) -> tuple[int, int, int, int] | None:
+        """Returns the top, left, bottom and right edges of the board in the image, or None if there
+        is no board. The last region found is returned if its frame is still there."""
+        with self.lock:
+            region = self.region
+        if region is not None and self.verify(screen, region):
+            with self.lock:
+                self.hits += 1
+            return region
+
+        region, threshold = self.search(screen)
+        with self.lock:
+            self.misses += 1
+            if region is not None:
+                self.region, self.threshold = region, threshold
+        return region
+
+    def forget(self: 'BoardLocator') -> None:
+        """Forgets the last region found, so that the next image is searched."""
+        with self.lock:
+            self.region = self.threshold = None
+
+    @staticmethod
+    def update(context: dict, region: tuple[int, int, int, int], origin: tuple[int, int] = (0, 0)) -> None:
+        """Records the region in the context, as 'top left', 'width' and 'height', in the coordinates
+        of the screen. The origin is the position of the image on the screen."""
+        top, left, bottom, right = region
+        context['top left'] = (origin[0] + left, origin[1] + top)
+        context['width'] = right - left
+        context['height'] = bottom - top
+
+
+# locator shared by the scans of the game on screen
+LOCATOR = BoardLocator()
@@ -0,0 +1,49 @@
+"""Usage: python -m pytest"""
+
+import numpy as np
+from locator import BoardLocator
+from ingest_test import window
+
+
+# ========== search() ==========
+def test_search_1():
+    """Test description: board among a toolbar, buttons and other boxes"""
+    assert BoardLocator().search(window())[0] == (80, 120, 532, 572)
+    assert BoardLocator().search(window(top=100, left=40)[..., 0])[0] == (100, 40, 552, 492)
+
+def test_search_2():
+    """Test description: no board"""
+    screen = np.full((300, 300, 3), 230, dtype=np.uint8)
+    assert BoardLocator().search(screen)[0] is None
+    screen[50:250, 50:250] = 20
+    assert BoardLocator().search(screen)[0] is None
+    assert BoardLocator(min_size=500).search(window())[0] is None
+
+# ========== locate() ==========
+def test_locate_1():
+    """Test description: the last region is reused while its frame is there"""
+    locator = BoardLocator()
+    assert locator.locate(window()) == (80, 120, 532, 572)
+    assert locator.locate(window()) == (80, 120, 532, 572)
+    assert (locator.hits, locator.misses) == (1, 1)
+    assert locator.locate(window(top=120, left=60)) == (120, 60, 572, 512)
+    assert (locator.hits, locator.misses) == (1, 2)
+    assert locator.locate(np.full((300, 300, 3), 230, dtype=np.uint8)) is None
+    assert locator.region == (120, 60, 572, 512)
+
+# ========== verify() ==========
+def test_verify_1():
+    """Test description: frame missing from one edge"""
+    locator = BoardLocator()
+    region = locator.locate(window())
+    screen = window()
+    screen[80:532, 570:572] = 235
+    assert locator.verify(window(), region) and not locator.verify(screen, region)
+    assert not locator.verify(window()[:300], region)
+
+# ========== update() ==========
+def test_update_1():
+    """Test description: region recorded as a selection on screen"""
+    context = {}
+    BoardLocator.update(context, (80, 120, 532, 572), origin=(10, 20))
+    assert context == {'top left': (130, 100), 'width': 452, 'height': 452}
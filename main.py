@@ -1,12 +1,19 @@
-from interaction import Controller, Screenshot
-from detection import Detection
-from solver import KillerSudokuSolver
-from Editor import editor
+from inputs import InputScheduler, INPUT_BACKENDS
+from solver import SOLVERS
+import threading
+import argparse
+import json
+import prediction
+import batch
 
 
-def scan(context: dict) -> None:
-    # obtain screenshot of sudoku board
-    context['screen'] = Screenshot.scan_sudoku_board(context)
+def scan(context: dict, select: bool = False) -> None:
+    from interaction import Controller, Screenshot
+    from detection import Detection
+
+    # obtain screenshot of sudoku board, found on screen unless it is selected by the user
+    screen = None if select else Screenshot.locate_sudoku_board(context)
+    context['screen'] = Screenshot.scan_sudoku_board(context) if screen is None else screen
     
     # obtain coordinates for all the boxes within the sudoku game
     context['box centers'] = Controller.calculate_box_centers(context)
@@ -14,11 +21,100 @@ def scan(context: dict) -> None:
     # obtain array representation of sudoku board
     context['data'] = Detection.process_board(context['screen'])
 
-if __name__ == '__main__':
+
+def enter(context: dict, solver: str = 'bitmask', backend: str | None = None, order: str = 'serpentine', 
+          navigation: str = 'auto', pause: float = 0.01) -> list | None:
+    from interaction import Controller
+
+    # the game is solved on copies of the arrays, so that the givens in context['data'] are still skipped
+    result = batch.solve_one((0, context['data'], solver, None))
+    if result.status != 'solved':
+        print(f'the game could not be solved: {result.status}' + (f' ({result.error})' if result.error else ''))
+        return None
+    return Controller.implement_solution(context, result.solution, backend, order, navigation, pause)
+
+
+def play(dry_run: bool = False, order: str = 'serpentine', navigation: str = 'auto', pause: float = 0.01, 
+         backend: str | None = None, select: bool = False, solver: str = 'bitmask') -> None:
+    # the interactive modules need a display, so they are only imported when playing
+    from Editor import editor
+    from prediction import Predictor
+
+    # load the models while the user selects the board
+    threading.Thread(target=Predictor.warm_up, daemon=True).start()
+
     context = {'title': 'Killer Sudoku Solver'}
-    scan(context)
+    scan(context, select)
     app = editor.KillerSudokuEditor(*context['data'])
     context['data'] = app.start()
-    solution = KillerSudokuSolver.solve(*context['data'])
-    Controller.implement_solution(context, solution)
-    exit()
+    events = enter(context, solver, 'recorder' if dry_run else backend, order, navigation, pause)
+    if dry_run and events is not None:
+        for event in events:
+            print(json.dumps(event._asdict()))
+
+
+def watch(interval: float = 0.5, games: int | None = None, solver: str = 'bitmask', timeout: float | None = None,
+          order: str = 'serpentine', navigation: str = 'auto', pause: float = 0.01, backend: str | None = None) -> None:
+    from watch import Watcher
+
+    watcher = Watcher(backend=backend, pause=pause, solver=solver, timeout=timeout, order=order, navigation=navigation)
+    try:
+        watcher.run(interval, games)
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(watcher.stats))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Killer Sudoku Solver')
+    subparsers = parser.add_subparsers(dest='command')
+    play_parser = subparsers.add_parser('play', help='scan, edit, solve and enter a game on screen (default)')
+    play_parser.add_argument('--dry-run', action='store_true', help='print the input events instead of sending them')
+    play_parser.add_argument('--order', choices=InputScheduler.ORDERS, default='serpentine', help='order the positions are entered in')
+    play_parser.add_argument('--navigation', choices=InputScheduler.NAVIGATIONS, default='auto', 
+                             help='move between positions with the arrow keys, with clicks, or with either (auto)')
+    play_parser.add_argument('--pause', type=float, default=0.01, help='number of seconds to wait after every input event')
+    play_parser.add_argument('--input', choices=list(INPUT_BACKENDS), default=None, 
+                             help='backend sending the input events (default: KILLER_SUDOKU_INPUT or pyautogui)')
+    play_parser.add_argument('--select', action='store_true', help='select the board by hand instead of finding it on screen')
+    play_parser.add_argument('-s', '--solver', choices=list(SOLVERS), default='bitmask', help='solver to use')
+    watch_parser = subparsers.add_parser('watch', help='keep playing every new game shown on screen, until interrupted')
+    watch_parser.add_argument('--interval', type=float, default=0.5, help='number of seconds between looks at the board')
+    watch_parser.add_argument('--games', type=int, default=None, help='number of games to play before exiting')
+    watch_parser.add_argument('-s', '--solver', choices=list(SOLVERS), default='bitmask', help='solver to use')
+    watch_parser.add_argument('-t', '--timeout', type=float, default=None, help='number of seconds allowed for each game')
+    watch_parser.add_argument('--order', choices=InputScheduler.ORDERS, default='serpentine', help='order the positions are entered in')
+    watch_parser.add_argument('--navigation', choices=InputScheduler.NAVIGATIONS, default='auto', 
+                              help='move between positions with the arrow keys, with clicks, or with either (auto)')
+    watch_parser.add_argument('--pause', type=float, default=0.01, help='number of seconds to wait after every input event')
+    watch_parser.add_argument('--input', choices=list(INPUT_BACKENDS), default=None, 
+                              help='backend sending the input events (default: KILLER_SUDOKU_INPUT or pyautogui)')
+    batch.add_arguments(subparsers.add_parser('solve', help='solve many games from a file'))
+    scan_parser = subparsers.add_parser('scan', help='read and solve the games in image files, without a display')
+    scan_parser.add_argument('inputs', nargs='+', help='image files, directories of images or glob patterns')
+    scan_parser.add_argument('-f', '--format', choices=['json', 'text'], default='json',
+                             help='format of the output: one JSON result per line, or the text format of the serialization module')
+    scan_parser.add_argument('-o', '--output', default='-', help='file to write the results to, - for stdout')
+    scan_parser.add_argument('-s', '--solver', choices=list(SOLVERS), default='bitmask', help='solver to use')
+    scan_parser.add_argument('-t', '--timeout', type=float, default=None, help='number of seconds allowed for each game')
+    scan_parser.add_argument('--no-solve', action='store_true', help='only detect the games')
+    scan_parser.add_argument('--backend', choices=list(prediction.BACKENDS), default=None, help='backend running the models')
+    args = parser.parse_args(argv)
+
+    if args.command == 'solve':
+        return batch.run(args)
+    if args.command == 'scan':
+        # detection pulls in scikit-image and scipy, so it is only imported when scanning
+        import ingest
+        return ingest.run(args)
+    if args.command == 'watch':
+        watch(args.interval, args.games, args.solver, args.timeout, args.order, args.navigation, args.pause, args.input)
+    elif args.command == 'play':
+        play(args.dry_run, args.order, args.navigation, args.pause, args.input, args.select, args.solver)
+    else:
+        play()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,34 @@
+"""Usage: python -m pytest"""
+
+import copy
+from interaction_test import context
+from solver_2_test import board
+import main
+
+
+# ========== enter() ==========
+def test_enter_1():
+    """Test description: the edited game is solved and only the empty boxes are typed in"""
+    game = context()
+    game['data'] = copy.deepcopy(game['data']) # the editor returns the arrays of the game
+    events = main.enter(game, 'bitmask', 'recorder')
+    digits = [key for event in events if event.kind == 'keys' for key in event.value if key.isdigit()]
+    assert len(digits) == sum(value == '' for row in board for value in row)
+    assert game['data'][0] == board
+
+def test_enter_2():
+    """Test description: the givens are skipped with every solver"""
+    for solver in main.SOLVERS:
+        game = context()
+        game['data'] = copy.deepcopy(game['data'])
+        events = main.enter(game, solver, 'recorder')
+        digits = [key for event in events if event.kind == 'keys' for key in event.value if key.isdigit()]
+        assert len(digits) == sum(value == '' for row in board for value in row)
+
+def test_enter_3(capsys):
+    """Test description: nothing is typed in for a game which cannot be solved"""
+    game = context()
+    game['data'] = copy.deepcopy(game['data'])
+    game['data'][0][0][0] = game['data'][0][0][3]
+    assert main.enter(game, 'bitmask', 'recorder') is None
+    assert 'unsolvable' in capsys.readouterr().out
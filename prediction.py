@@ -1,30 +1,218 @@
-from tensorflow import keras
-import tensorflow as tf
+"""This module runs the recognizers trained in the Models directory.
+
+The models can be run by one of the backends in BACKENDS:
+
+keras: loads the model with keras and runs it with Model.predict_on_batch.
+numpy: reads the layers and weights of the .keras file and runs the forward pass with numpy.
+       It does not import tensorflow.
+
+The backend is chosen with the KILLER_SUDOKU_BACKEND environment variable, or Predictor.use.
+By default, keras is used if tensorflow is installed. Neither backend is imported until a
+model is first used.
+"""
+
+import importlib.util
+import threading
+import zipfile
 import pathlib
+import json
+import re
+import io
+import os
 import numpy as np
 
+
+# ========== backends ==========
+class KerasBackend:
+    """Runs a model with keras."""
+    def __init__(self: 'KerasBackend', path: str | os.PathLike) -> None:
+        from tensorflow import keras
+        self.model = keras.models.load_model(path)
+
+    def predict(self: 'KerasBackend', batch: np.ndarray) -> np.ndarray:
+        """Returns the outputs of the model for a batch of inputs."""
+        return np.asarray(self.model.predict_on_batch(batch))
+
+
+class NumpyBackend:
+    """Runs a sequential model with numpy, using the layers and weights stored in a .keras file.
+
+    Only the layers used by the recognizers are supported - Conv2D with stride 1, MaxPooling2D,
+    Flatten, Dense, ReLU, Softmax and Dropout, which does nothing during inference.
+    """
+    ACTIVATIONS = {
+        'linear': lambda x: x,
+        'relu': lambda x: np.maximum(x, 0),
+        'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+        'softmax': lambda x: NumpyBackend.softmax(x),
+    }
+
+    def __init__(self: 'NumpyBackend', path: str | os.PathLike) -> None:
+        import h5py
+        with zipfile.ZipFile(path) as archive:
+            config = json.loads(archive.read('config.json'))
+            weights = {}
+            def visit(name, item):
+                # layers are stored as layers/<name>/vars/<index>, with backslashes if saved on Windows
+                parts = name.replace('\\', '/').split('/')
+                if isinstance(item, h5py.Dataset) and parts[0] == 'layers' and parts[-2] == 'vars':
+                    weights.setdefault(parts[-3], {})[int(parts[-1])] = np.asarray(item[()], dtype=np.float32)
+            with h5py.File(io.BytesIO(archive.read('model.weights.h5')), 'r') as f:
+                f.visititems(visit)
+
+        if config['class_name'] != 'Sequential':
+            raise ValueError(f'only Sequential models are supported, got {config["class_name"]}')
+        # the weights of each layer are stored under the snake case name of its class, numbered in order
+        self.layers, seen = [], {}
+        for layer in config['config']['layers']:
+            kind, options = layer['class_name'], layer['config']
+            name = re.sub(r'([a-z])([A-Z])', r'\1_\2', re.sub(r'(.)([A-Z][a-z]+)', r'\1_\2', kind)).lower()
+            seen[name] = seen.get(name, -1) + 1
+            variables = weights.get(f'{name}_{seen[name]}' if seen[name] else name, {})
+            self.layers.extend(self.build(kind, options, [variables[k] for k in sorted(variables)]))
+
+    @classmethod
+    def build(cls, kind: str, options: dict, variables: list[np.ndarray]) -> list:
+        """Returns the functions applying a layer of the model to a batch."""
+        if kind in ('InputLayer', 'Dropout'):
+            return []
+        elif kind == 'Conv2D':
+            if tuple(options['strides']) != (1, 1) or tuple(options.get('dilation_rate', (1, 1))) != (1, 1):
+                raise ValueError('only Conv2D layers with strides and dilation of 1 are supported')
+            kernel, bias = variables if options['use_bias'] else (variables[0], 0)
+            layer = lambda x: cls.conv2d(x, kernel, options['padding']) + bias
+        elif kind == 'MaxPooling2D':
+            if tuple(options['strides']) != tuple(options['pool_size']) or options['padding'] != 'valid':
+                raise ValueError('only MaxPooling2D layers with strides equal to the pool size are supported')
+            layer = lambda x: cls.max_pool(x, options['pool_size'])
+        elif kind == 'Flatten':
+            layer = lambda x: x.reshape(len(x), -1)
+        elif kind == 'Dense':
+            kernel, bias = variables if options['use_bias'] else (variables[0], 0)
+            layer = lambda x: x @ kernel + bias
+        elif kind == 'ReLU':
+            if options.get('max_value') is not None or options.get('negative_slope') or options.get('threshold'):
+                raise ValueError('only ReLU layers with default options are supported')
+            return [cls.ACTIVATIONS['relu']]
+        elif kind == 'Softmax':
+            return [cls.ACTIVATIONS['softmax']]
+        else:
+            raise ValueError(f'unsupported layer {kind}')
+
+        activation = options.get('activation', 'linear')
+        if activation not in cls.ACTIVATIONS:
+            raise ValueError(f'unsupported activation {activation}')
+        return [layer] if activation == 'linear' else [layer, cls.ACTIVATIONS[activation]]
+
+    @staticmethod
+    def conv2d(x: np.ndarray, kernel: np.ndarray, padding: str) -> np.ndarray:
+        """Convolves a batch of images of shape (n, h, w, c) with a kernel of shape (kh, kw, c, filters)."""
+        kh, kw = kernel.shape[:2]
+        if padding == 'same':
+            x = np.pad(x, ((0, 0), ((kh - 1) // 2, kh // 2), ((kw - 1) // 2, kw // 2), (0, 0)))
+        windows = np.lib.stride_tricks.sliding_window_view(x, (kh, kw), axis=(1, 2))
+        return np.tensordot(windows, kernel, axes=([4, 5, 3], [0, 1, 2]))
+
+    @staticmethod
+    def max_pool(x: np.ndarray, pool_size: tuple[int, int]) -> np.ndarray:
+        """Takes the maximum of every pool_size block of a batch of images of shape (n, h, w, c)."""
+        n, h, w, c = x.shape
+        ph, pw = pool_size
+        x = x[:, :h - h % ph, :w - w % pw]
+        return x.reshape(n, h // ph, ph, w // pw, pw, c).max(axis=(2, 4))
+
+    @staticmethod
+    def softmax(x: np.ndarray) -> np.ndarray:
+        x = np.exp(x - x.max(axis=-1, keepdims=True))
+        return x / x.sum(axis=-1, keepdims=True)
+
+    def predict(self: 'NumpyBackend', batch: np.ndarray) -> np.ndarray:
+        """Returns the outputs of the model for a batch of inputs."""
+        x = np.asarray(batch, dtype=np.float32)
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+
+BACKENDS = {'keras': KerasBackend, 'numpy': NumpyBackend}
+DEFAULT_BACKEND = os.environ.get('KILLER_SUDOKU_BACKEND') or (
+    'keras' if importlib.util.find_spec('tensorflow') else 'numpy')
+
+
+# ========== predictions ==========
 class Predictor:
-    digit_recognizer = keras.models.load_model(pathlib.Path('Models', 'digit_recognizer.keras'))
-    wall_recognizer = keras.models.load_model(pathlib.Path('Models', 'wall_recognizer.keras'))
+    """Runs the recognizers in the Models directory.
+
+    The models are loaded the first time they are used, or by Predictor.warm_up, and kept in 
+    Predictor.models for every later call. Importing this module does not load any model.
+    """
+    directory = pathlib.Path(__file__).parent / 'Models'
+    names = ('digit_recognizer', 'wall_recognizer')
+    backend = DEFAULT_BACKEND
+    models = {} # loaded models by (backend, name)
+    fingerprints = {} # fingerprint of the model files by directory
+    lock = threading.Lock()
+
+    @classmethod
+    def model(cls, name: str) -> KerasBackend | NumpyBackend:
+        """Returns the model with the given name, loading it with the current backend if needed."""
+        key = (cls.backend, name)
+        if key not in cls.models:
+            with cls.lock:
+                if key not in cls.models:
+                    cls.models[key] = BACKENDS[cls.backend](cls.directory / f'{name}.keras')
+        return cls.models[key]
+
+    @classmethod
+    def fingerprint(cls) -> str:
+        """Returns a value identifying the model files, which changes when they are replaced."""
+        if cls.fingerprints.get(cls.directory) is None:
+            stats = [(cls.directory / f'{name}.keras').stat() for name in cls.names]
+            cls.fingerprints[cls.directory] = ','.join(f'{stat.st_size}:{stat.st_mtime_ns}' for stat in stats)
+        return cls.fingerprints[cls.directory]
+
+    @classmethod
+    def warm_up(cls) -> None:
+        """Loads every model and runs it once, so that the first detection is not slowed down."""
+        for name in cls.names:
+            cls.model(name).predict(np.zeros((1, 28, 28, 1), dtype=np.float32))
+
+    @classmethod
+    def use(cls, backend: str) -> None:
+        """Runs the models with another backend in BACKENDS. Models already loaded stay in the cache."""
+        if backend not in BACKENDS:
+            raise ValueError(f'unknown backend {backend!r}, expected one of {list(BACKENDS)}')
+        cls.backend = backend
 
     @staticmethod
-    def format_image(image: np.ndarray) -> tf.data.Dataset:
-        image = tf.data.Dataset.from_tensor_slices([image])
-        def transform(x):
-            x = tf.reshape(x, [1, 28, 28, 1])
-            x = tf.cast(x, tf.float32) / 255
-            x = tf.image.resize(x, [28,28])
-            return x
-        image = image.map(transform)
-        return image
+    def format_batch(images: np.ndarray) -> np.ndarray:
+        """Scales a stack of 28x28 images to the input of the models."""
+        return np.asarray(images, dtype=np.float32).reshape(-1, 28, 28, 1) / 255
 
     @classmethod
     def detect_digit(cls, image: np.ndarray) -> int:
-        image = cls.format_image(image)
-        return cls.digit_recognizer.predict(image).argmax(axis=1)[0]
+        return cls.detect_digits(image[np.newaxis])[0]
 
     @classmethod
     def detect_borders(cls, image: np.ndarray) -> tuple[bool, bool, bool, bool]:
-        image = cls.format_image(image)
-        return tuple((cls.wall_recognizer.predict(image) >= 0.5)[0])
-    
+        return tuple(cls.detect_borders_batch(image[np.newaxis])[0])
+
+    @classmethod
+    def detect_digits(cls, images: np.ndarray) -> np.ndarray:
+        """Returns the digit in each image of the stack with a single forward pass."""
+        return cls.digit_probabilities(images).argmax(axis=1)
+
+    @classmethod
+    def digit_probabilities(cls, images: np.ndarray) -> np.ndarray:
+        """Returns the probability of each digit from 0 to 9 in each image of the stack."""
+        return cls.model('digit_recognizer').predict(cls.format_batch(images)).astype(float)
+
+    @classmethod
+    def detect_borders_batch(cls, images: np.ndarray) -> np.ndarray:
+        """Returns the top, bottom, left and right borders in each image of the stack with a single forward pass."""
+        return cls.border_probabilities(images) >= 0.5
+
+    @classmethod
+    def border_probabilities(cls, images: np.ndarray) -> np.ndarray:
+        """Returns the probability of a top, bottom, left and right border in each image of the stack."""
+        return cls.model('wall_recognizer').predict(cls.format_batch(images)).astype(float)
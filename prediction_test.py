@@ -0,0 +1,87 @@
+"""Usage: python -m pytest"""
+
+import pathlib
+import numpy as np
+import pytest
+from prediction import NumpyBackend, KerasBackend, Predictor, BACKENDS
+
+
+DIGIT_RECOGNIZER = pathlib.Path('Models', 'digit_recognizer.keras')
+WALL_RECOGNIZER = pathlib.Path('Models', 'wall_recognizer.keras')
+
+
+def images(n: int = 16) -> np.ndarray:
+    """Returns a batch of random images formatted for the models."""
+    return Predictor.format_batch(np.random.default_rng(0).integers(0, 256, (n, 28, 28)))
+
+# ========== NumpyBackend ==========
+def test_conv2d_1():
+    """Test description: same padding matches a direct convolution"""
+    rng = np.random.default_rng(0)
+    x, kernel = rng.random((2, 5, 6, 3)), rng.random((3, 3, 3, 4))
+    padded = np.pad(x, ((0, 0), (1, 1), (1, 1), (0, 0)))
+    expected = np.zeros((2, 5, 6, 4))
+    for n in range(2):
+        for i in range(5):
+            for j in range(6):
+                expected[n, i, j] = np.tensordot(padded[n, i:i + 3, j:j + 3], kernel, axes=3)
+    assert np.allclose(NumpyBackend.conv2d(x, kernel, 'same'), expected)
+
+def test_conv2d_2():
+    """Test description: valid padding shrinks the image"""
+    x, kernel = np.ones((1, 6, 6, 1)), np.ones((5, 5, 1, 2))
+    assert NumpyBackend.conv2d(x, kernel, 'valid').shape == (1, 2, 2, 2)
+
+def test_max_pool_1():
+    """Test description: odd sizes are cropped"""
+    x = np.arange(25, dtype=np.float32).reshape(1, 5, 5, 1)
+    assert NumpyBackend.max_pool(x, (2, 2))[0, :, :, 0].tolist() == [[6, 8], [16, 18]]
+
+def test_predict_1():
+    """Test description: digit recognizer outputs probabilities of 10 digits"""
+    output = NumpyBackend(DIGIT_RECOGNIZER).predict(images())
+    assert output.shape == (16, 10)
+    assert np.allclose(output.sum(axis=1), 1, atol=1e-5)
+
+def test_predict_2():
+    """Test description: wall recognizer outputs probabilities of 4 borders"""
+    output = NumpyBackend(WALL_RECOGNIZER).predict(images())
+    assert output.shape == (16, 4)
+    assert ((output >= 0) & (output <= 1)).all()
+
+def test_predict_3():
+    """Test description: matches keras within tolerance"""
+    pytest.importorskip('tensorflow')
+    for path in (DIGIT_RECOGNIZER, WALL_RECOGNIZER):
+        assert np.allclose(NumpyBackend(path).predict(images()), KerasBackend(path).predict(images()), atol=1e-4)
+
+# ========== Predictor ==========
+def test_detect_digit_1():
+    """Test description: vertical stroke is a 1"""
+    image = np.zeros((28, 28))
+    image[4:24, 13:16] = 255
+    assert Predictor.detect_digit(image) == 1
+
+def test_digit_probabilities_1():
+    """Test description: digits are the most likely ones"""
+    batch = np.random.default_rng(0).integers(0, 256, (8, 28, 28))
+    probabilities = Predictor.digit_probabilities(batch)
+    assert probabilities.shape == (8, 10)
+    assert Predictor.detect_digits(batch).tolist() == probabilities.argmax(axis=1).tolist()
+
+def test_use_1():
+    """Test description: unknown backend"""
+    with pytest.raises(ValueError):
+        Predictor.use('onnx')
+    assert Predictor.backend in BACKENDS
+
+def test_model_1(monkeypatch):
+    """Test description: models are loaded once and shared"""
+    monkeypatch.setattr(Predictor, 'backend', 'numpy')
+    assert Predictor.model('digit_recognizer') is Predictor.model('digit_recognizer')
+
+def test_warm_up_1(monkeypatch):
+    """Test description: every model is loaded"""
+    monkeypatch.setattr(Predictor, 'backend', 'numpy')
+    Predictor.warm_up()
+    assert {('numpy', name) for name in Predictor.names} <= set(Predictor.models)
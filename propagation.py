@@ -0,0 +1,204 @@
+"""This module applies logical deductions to narrow down the digits allowed at each position."""
+
+from cages import CAGE_COMBINATIONS, MAX_SUM
+from config import *
+
+
+# positions within each row, column and 3x3 box, pos = r * SUDOKU_SIZE + c
+ROWS = [tuple(r * SUDOKU_SIZE + c for c in range(SUDOKU_SIZE)) for r in range(SUDOKU_SIZE)]
+COLS = [tuple(r * SUDOKU_SIZE + c for r in range(SUDOKU_SIZE)) for c in range(SUDOKU_SIZE)]
+BOXES = [tuple((i + dr) * SUDOKU_SIZE + j + dc
+               for dr in range(SUDOKU_BOX_SIZE) for dc in range(SUDOKU_BOX_SIZE))
+         for i in range(0, SUDOKU_SIZE, SUDOKU_BOX_SIZE) for j in range(0, SUDOKU_SIZE, SUDOKU_BOX_SIZE)]
+HOUSES = ROWS + COLS + BOXES
+
+
+class Propagator:
+    """Constraint propagation over the bitmask representation of a killer sudoku game.
+
+    The deductions narrow BitmaskState.allowed and place every digit that is forced.
+    They are applied repeatedly until none of them makes progress:
+
+    1. Naked singles - a position with a single digit allowed takes that digit.
+    2. Hidden singles - a digit allowed at a single position of a row, column or box goes there.
+    3. Group combinations - only digits found in a combination of the group's size and sum,
+       which fits the digits allowed at its positions, are kept.
+    4. Innies and outies - every row, column and box sums to 45, so the positions of a house not
+       covered by groups inside it, or the positions sticking out of the groups overlapping it,
+       form extra groups with a known sum.
+    """
+    @classmethod
+    def sum_groups(cls, state: 'BitmaskState') -> list[tuple[tuple[int], int]]:
+        """Returns the sets of positions with a known sum whose digits cannot repeat.
+
+        Parameters
+        ----------
+        state: BitmaskState
+            The bitmask representation of the game.
+
+        Returns
+        -------
+        sum_groups: list[tuple[tuple[int], int]]
+            The positions and sum of each group, followed by the innies and outies of every house.
+        """
+        sum_groups = [(tuple(cells), limit) for cells, limit in zip(state.cage_cells, state.cage_limit)]
+        for house in HOUSES:
+            inside = set(house)
+            overlapping = {state.cage_of[pos] for pos in house}
+
+            # innies - positions of the house which are not in a group lying completely inside the house
+            innies, total = set(house), MAX_SUM
+            for cage in overlapping:
+                if inside.issuperset(state.cage_cells[cage]):
+                    innies.difference_update(state.cage_cells[cage])
+                    total -= state.cage_limit[cage]
+            if innies:
+                sum_groups.append((tuple(sorted(innies)), total))
+
+            # outies - positions outside of the house which belong to a group overlapping the house
+            outies = {pos for cage in overlapping for pos in state.cage_cells[cage]} - inside
+            total = sum(state.cage_limit[cage] for cage in overlapping) - MAX_SUM
+            if outies and (len(outies) == 1 or any(outies.issubset(other) for other in HOUSES)):
+                # digits are only distinct if the outies share a house
+                sum_groups.append((tuple(sorted(outies)), total))
+
+        # remove duplicates while keeping the groups first
+        return list(dict.fromkeys(sum_groups))
+
+    @classmethod
+    def reduce(cls, state: 'BitmaskState', sum_groups: list[tuple[tuple[int], int]]) -> bool:
+        """Applies the deductions until the game stops changing.
+
+        Parameters
+        ----------
+        state: BitmaskState
+            The bitmask representation of the game. It is updated in place.
+        sum_groups: list[tuple[tuple[int], int]]
+            The sets of positions with a known sum, as returned by Propagator.sum_groups.
+
+        Returns
+        -------
+        validity: bool
+            Indicates if the game can still be solved. If False, a contradiction was found.
+        """
+        while True:
+            naked = cls.naked_singles(state)
+            if naked is None:
+                return False
+            hidden = cls.hidden_singles(state)
+            if hidden is None:
+                return False
+            combined = cls.combinations(state, sum_groups)
+            if combined is None:
+                return False
+            if not (naked or hidden or combined):
+                return True
+
+    @classmethod
+    def naked_singles(cls, state: 'BitmaskState') -> bool | None:
+        """Narrows every empty position to its candidates and fills in those with a single candidate.
+
+        Returns
+        -------
+        changed: bool | None
+            Indicates if the game changed. If None, a position has no digit left.
+        """
+        changed = False
+        allowed = state.allowed
+        for pos in range(SUDOKU_SIZE ** 2):
+            if state.cells[pos]:
+                continue
+            mask = state.candidates(pos)
+            if mask == 0:
+                return None
+            if mask != allowed[pos]:
+                allowed[pos] = mask
+                changed = True
+            if mask & (mask - 1) == 0:
+                state.place(pos, mask)
+                changed = True
+        return changed
+
+    @classmethod
+    def hidden_singles(cls, state: 'BitmaskState') -> bool | None:
+        """Fills in the digits which are allowed at a single position of a row, column or box.
+
+        Returns
+        -------
+        changed: bool | None
+            Indicates if the game changed. If None, a digit has no position left in a house.
+        """
+        changed = False
+        allowed, cells = state.allowed, state.cells
+        for house in HOUSES:
+            placed = once = twice = 0
+            for pos in house:
+                if cells[pos]:
+                    placed |= 1 << (cells[pos] - 1)
+                else:
+                    twice |= once & allowed[pos]
+                    once |= allowed[pos]
+            if placed | once != ALL_DIGITS:
+                return None
+
+            single = once & ~twice & ~placed
+            for pos in house:
+                if not single:
+                    break
+                bit = allowed[pos] & single if not cells[pos] else 0
+                if not bit:
+                    continue
+                if bit & (bit - 1) or not bit & state.candidates(pos):
+                    # two digits need the same position, or the digit was ruled out by an earlier placement
+                    return None
+                allowed[pos] = bit
+                state.place(pos, bit)
+                single ^= bit
+                changed = True
+        return changed
+
+    @classmethod
+    def combinations(cls, state: 'BitmaskState', sum_groups: list[tuple[tuple[int], int]]) -> bool | None:
+        """Keeps only the digits which appear in a combination that can fill each group.
+
+        Returns
+        -------
+        changed: bool | None
+            Indicates if the game changed. If None, a group has no combination left.
+        """
+        changed = False
+        allowed, cells = state.allowed, state.cells
+        for positions, total in sum_groups:
+            used, placed, free = 0, 0, []
+            for pos in positions:
+                if cells[pos]:
+                    used |= 1 << (cells[pos] - 1)
+                    placed += cells[pos]
+                else:
+                    free.append(pos)
+            if not free:
+                if placed != total:
+                    return None
+                continue
+
+            union = 0
+            for pos in free:
+                union |= allowed[pos]
+
+            # digits of each combination which still have to be placed must fit the empty positions
+            possible = 0
+            for combination in CAGE_COMBINATIONS.get((len(positions), total), ()):
+                rest = combination & ~used
+                if (combination & used != used or rest & ~union or
+                    any(not allowed[pos] & rest for pos in free)):
+                    continue
+                possible |= rest
+            if possible == 0:
+                return None
+
+            for pos in free:
+                mask = allowed[pos] & possible
+                if mask != allowed[pos]:
+                    allowed[pos] = mask
+                    changed = True
+        return changed
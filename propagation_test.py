@@ -0,0 +1,85 @@
+"""Usage: python -m pytest"""
+
+import copy
+import pytest
+from propagation import Propagator, HOUSES
+from solver import FastKillerSudokuSolver, BitmaskState
+from solver_2_test import board, groups, limits, neighbors, solution
+from solver_3_test import game
+
+
+# ========== sum_groups() ==========
+def test_sum_groups_1():
+    """Test description: the groups come first"""
+    state = BitmaskState(groups, limits, neighbors)
+    sum_groups = Propagator.sum_groups(state)
+    assert sum_groups[:len(limits)] == [(tuple(x * 9 + y for x, y in neighbors[n]), limits[n]) for n in sorted(limits)]
+
+def test_sum_groups_2():
+    """Test description: innies of the first row"""
+    state = BitmaskState(groups, limits, neighbors)
+    # groups 1, 2, 4, 6 and 7 lie within the first row, so positions 3 and 5 sum to 45 - 35
+    assert ((3, 5), 10) in Propagator.sum_groups(state)
+
+def test_sum_groups_3():
+    """Test description: every sum group agrees with the solution"""
+    state = BitmaskState(groups, limits, neighbors)
+    for positions, total in Propagator.sum_groups(state):
+        assert sum(int(solution[pos // 9][pos % 9]) for pos in positions) == total
+
+# ========== reduce() ==========
+def test_reduce_1():
+    """Test description: deductions agree with the solution"""
+    state = BitmaskState(groups, limits, neighbors)
+    state.load(board)
+    assert Propagator.reduce(state, Propagator.sum_groups(state)) == True
+    for pos in range(81):
+        assert state.allowed[pos] >> (int(solution[pos // 9][pos % 9]) - 1) & 1
+
+def test_reduce_2():
+    """Test description: contradiction"""
+    state = BitmaskState(groups, limits, neighbors)
+    temp = copy.deepcopy(board)
+    temp[0][2] = '8' # group of 1 summing to 9
+    state.load(temp)
+    assert Propagator.reduce(state, Propagator.sum_groups(state)) == False
+
+def test_hidden_singles_1():
+    """Test description: digit allowed at a single position of a row"""
+    state = BitmaskState(groups, limits, neighbors)
+    for pos in HOUSES[0][1:]:
+        state.allowed[pos] &= ~1
+    assert Propagator.hidden_singles(state) == True
+    assert state.cells[0] == 1
+
+# ========== propagate() ==========
+def test_propagate_1():
+    """Test description: game is solved without searching"""
+    result, candidates = FastKillerSudokuSolver.propagate(*game())
+    assert result == solution
+    assert candidates == [[[x] for x in row] for row in solution]
+
+def test_propagate_2():
+    """Test description: arrays passed in are not modified"""
+    data = game()
+    FastKillerSudokuSolver.propagate(*data)
+    assert data == game()
+
+def test_propagate_3():
+    """Test description: board without any values placed"""
+    data = list(game())
+    data[0] = [[''] * 9 for _ in range(9)]
+    result, candidates = FastKillerSudokuSolver.propagate(*data)
+    assert result == solution
+
+def test_propagate_4():
+    """Test description: invalid board without solution"""
+    data = game()
+    data[0][0][0] = '1'
+    assert FastKillerSudokuSolver.propagate(*data) == None
+
+def test_propagate_5():
+    """Test description: search is not needed after propagation"""
+    stats = {}
+    FastKillerSudokuSolver.solve(*game(), stats=stats)
+    assert stats == {'empty': 0, 'nodes': 0}
@@ -0,0 +1,160 @@
+"""This module contains a compact representation of a killer sudoku game."""
+
+from cages import MAX_SUM
+from config import *
+
+
+# bits of the border field of a position
+TOP, BOTTOM, LEFT, RIGHT = 1, 2, 4, 8
+
+
+class Puzzle:
+    """A killer sudoku game stored in a handful of bytes objects.
+
+    Every position, pos = r * SUDOKU_SIZE + c, has one byte in each of
+
+    digits: the value placed at the position, 0 if empty.
+    sums: the group sum shown at the position, 0 if none.
+    borders: the borders around the position, packed as TOP | BOTTOM | LEFT | RIGHT.
+
+    The groups are found once when the puzzle is created. The positions of group k are
+    cage_cells[cage_starts[k]:cage_starts[k + 1]], its sum is cage_sums[k] and cage_of
+    links each position to its group.
+    """
+    __slots__ = ('digits', 'sums', 'borders', 'cage_of', 'cage_cells', 'cage_starts', 'cage_sums')
+
+    def __init__(self: 'Puzzle', digits: bytes, sums: bytes, borders: bytes) -> None:
+        """Creates a puzzle and finds its groups.
+
+        Parameters
+        ----------
+        digits: bytes
+            The value placed at each position, 0 if empty.
+        sums: bytes
+            The group sum shown at each position, 0 if none.
+        borders: bytes
+            The borders around each position, packed as TOP | BOTTOM | LEFT | RIGHT.
+        """
+        size = SUDOKU_SIZE ** 2
+        if not len(digits) == len(sums) == len(borders) == size:
+            raise ValueError(f'expected {size} positions, got {len(digits)}, {len(sums)} and {len(borders)}')
+        self.digits = bytes(digits)
+        self.sums = bytes(sums)
+        self.borders = bytes(borders)
+        self.find_cages()
+
+    def find_cages(self: 'Puzzle') -> None:
+        """Establishes the groups by exploring the positions which are not separated by a border."""
+        size = SUDOKU_SIZE ** 2
+        cage_of = bytearray([255]) * size
+        cells, starts, totals = bytearray(), bytearray(), bytearray()
+        for start in range(size):
+            if cage_of[start] != 255:
+                continue
+            cage = len(starts)
+            starts.append(len(cells))
+            cage_of[start] = cage
+            stack, members = [start], []
+            while stack:
+                pos = stack.pop()
+                members.append(pos)
+                r, c, border = pos // SUDOKU_SIZE, pos % SUDOKU_SIZE, self.borders[pos]
+                for side, dr, dc in ((TOP, -1, 0), (BOTTOM, 1, 0), (LEFT, 0, -1), (RIGHT, 0, 1)):
+                    if border & side or not (0 <= r + dr < SUDOKU_SIZE and 0 <= c + dc < SUDOKU_SIZE):
+                        continue
+                    other = pos + dr * SUDOKU_SIZE + dc
+                    if cage_of[other] == 255:
+                        cage_of[other] = cage
+                        stack.append(other)
+            members.sort()
+            cells.extend(members)
+            # the sum of the group is shown at its first position with a sum
+            totals.append(next((self.sums[pos] for pos in members if self.sums[pos]), 0))
+        starts.append(len(cells))
+        self.cage_of = bytes(cage_of)
+        self.cage_cells = bytes(cells)
+        self.cage_starts = bytes(starts)
+        self.cage_sums = bytes(totals)
+
+    @property
+    def cage_count(self: 'Puzzle') -> int:
+        """The number of groups."""
+        return len(self.cage_sums)
+
+    def cage(self: 'Puzzle', k: int) -> bytes:
+        """Returns the positions of group k."""
+        return self.cage_cells[self.cage_starts[k]:self.cage_starts[k + 1]]
+
+    @classmethod
+    def from_tuple(cls, data: tuple[list]) -> 'Puzzle':
+        """Creates a puzzle from (board, sums, top_border, bottom_border, left_border, right_border),
+        as returned by Detection.process_board and KillerSudokuEditor and passed to KillerSudokuSolver.solve.
+        Raises ValueError if a sum is not between 0 and 45, such as a sum misread by detection."""
+        board, sums, top_border, bottom_border, left_border, right_border = data
+        digits, totals, borders = bytearray(), bytearray(), bytearray()
+        for i in range(SUDOKU_SIZE):
+            for j in range(SUDOKU_SIZE):
+                if not 0 <= sums[i][j] <= MAX_SUM:
+                    raise ValueError(f'sum at ({i}, {j}) is {sums[i][j]}, expected between 0 and {MAX_SUM}')
+                digits.append(int(board[i][j]) if board[i][j] != '' else 0)
+                totals.append(sums[i][j])
+                borders.append(TOP * bool(top_border[i][j]) | BOTTOM * bool(bottom_border[i][j]) |
+                               LEFT * bool(left_border[i][j]) | RIGHT * bool(right_border[i][j]))
+        return cls(digits, totals, borders)
+
+    @classmethod
+    def from_layout(cls, digits: bytes, cage_of: bytes, cage_sums: bytes) -> 'Puzzle':
+        """Creates a puzzle from its groups. Borders are drawn between positions of different 
+        groups and around the board, and the sum of a group is shown at its first position.
+
+        Parameters
+        ----------
+        digits: bytes
+            The value placed at each position, 0 if empty.
+        cage_of: bytes
+            The group of each position.
+        cage_sums: bytes
+            The sum of each group.
+        """
+        borders, sums, shown = bytearray(), bytearray(), set()
+        for pos, cage in enumerate(cage_of):
+            r, c = pos // SUDOKU_SIZE, pos % SUDOKU_SIZE
+            border = 0
+            for side, dr, dc in ((TOP, -1, 0), (BOTTOM, 1, 0), (LEFT, 0, -1), (RIGHT, 0, 1)):
+                if (not (0 <= r + dr < SUDOKU_SIZE and 0 <= c + dc < SUDOKU_SIZE) or 
+                    cage_of[pos + dr * SUDOKU_SIZE + dc] != cage):
+                    border |= side
+            borders.append(border)
+            sums.append(cage_sums[cage] if cage not in shown else 0)
+            shown.add(cage)
+        return cls(digits, sums, borders)
+
+    def to_tuple(self: 'Puzzle') -> tuple[list]:
+        """Returns (board, sums, top_border, bottom_border, left_border, right_border) as new arrays."""
+        rows = range(0, SUDOKU_SIZE ** 2, SUDOKU_SIZE)
+        board = [[str(d) if d else '' for d in self.digits[r:r + SUDOKU_SIZE]] for r in rows]
+        sums = [list(self.sums[r:r + SUDOKU_SIZE]) for r in rows]
+        top_border, bottom_border, left_border, right_border = (
+            [[bool(b & side) for b in self.borders[r:r + SUDOKU_SIZE]] for r in rows]
+            for side in (TOP, BOTTOM, LEFT, RIGHT))
+        return board, sums, top_border, bottom_border, left_border, right_border
+
+    def __eq__(self: 'Puzzle', other: object) -> bool:
+        if not isinstance(other, Puzzle):
+            return NotImplemented
+        return (self.digits, self.sums, self.borders) == (other.digits, other.sums, other.borders)
+
+    def __hash__(self: 'Puzzle') -> int:
+        return hash((self.digits, self.sums, self.borders))
+
+    def __repr__(self: 'Puzzle') -> str:
+        givens = ''.join(str(d) if d else '.' for d in self.digits)
+        return f'Puzzle({givens!r}, cages={self.cage_count})'
+
+    def __getstate__(self: 'Puzzle') -> tuple[bytes, bytes, bytes]:
+        # the groups are found again when unpickled
+        return self.digits, self.sums, self.borders
+
+    def __setstate__(self: 'Puzzle', state: tuple[bytes, bytes, bytes]) -> None:
+        self.digits, self.sums, self.borders = state
+        self.find_cages()
@@ -0,0 +1,77 @@
+"""Usage: python -m pytest"""
+
+import pickle
+import pytest
+from puzzle import Puzzle, TOP, BOTTOM, LEFT, RIGHT
+from solver import KillerSudokuSolver, FastKillerSudokuSolver
+from solver_2_test import sums, neighbors, limits, solution
+from solver_3_test import game
+
+
+# ========== from_tuple() and to_tuple() ==========
+def test_puzzle_1():
+    """Test description: round trip through the six arrays"""
+    assert Puzzle.from_tuple(game()).to_tuple() == game()
+
+def test_puzzle_2():
+    """Test description: packed values"""
+    puzzle = Puzzle.from_tuple(game())
+    assert puzzle.digits[3] == 8 and puzzle.digits[0] == 0
+    assert puzzle.sums[0] == 10
+    assert puzzle.borders[0] == TOP | BOTTOM | LEFT
+    assert puzzle.borders[80] == TOP | BOTTOM | RIGHT
+
+def test_puzzle_3():
+    """Test description: solvers accept the arrays of a puzzle"""
+    puzzle = Puzzle.from_tuple(game())
+    assert FastKillerSudokuSolver.solve(*puzzle.to_tuple()) == solution
+    assert KillerSudokuSolver.solve(*puzzle.to_tuple()) == solution
+
+def test_puzzle_4():
+    """Test description: wrong number of positions"""
+    with pytest.raises(ValueError):
+        Puzzle(bytes(80), bytes(81), bytes(81))
+
+def test_puzzle_5():
+    """Test description: misread sum out of range"""
+    data = game()
+    data[1][2][4] = 317
+    with pytest.raises(ValueError, match=r'\(2, 4\) is 317'):
+        Puzzle.from_tuple(data)
+    data[1][2][4] = -1
+    with pytest.raises(ValueError, match=r'\(2, 4\) is -1'):
+        Puzzle.from_tuple(data)
+
+# ========== cages ==========
+def test_cages_1():
+    """Test description: groups agree with KillerSudokuSolver.group"""
+    puzzle = Puzzle.from_tuple(game())
+    expected = sorted((sorted(x * 9 + y for x, y in neighbors[n]), limits[n]) for n in limits)
+    assert sorted((sorted(puzzle.cage(k)), puzzle.cage_sums[k]) for k in range(puzzle.cage_count)) == expected
+
+def test_cages_2():
+    """Test description: each position belongs to its group"""
+    puzzle = Puzzle.from_tuple(game())
+    for k in range(puzzle.cage_count):
+        assert all(puzzle.cage_of[pos] == k for pos in puzzle.cage(k))
+
+def test_cages_3():
+    """Test description: sum shown at a single position of the group"""
+    data = game()
+    data[1][0][1] = 0
+    puzzle = Puzzle.from_tuple(data)
+    assert puzzle.cage_sums[puzzle.cage_of[1]] == 10
+
+# ========== other ==========
+def test_puzzle_equality_1():
+    """Test description: equal puzzles"""
+    assert Puzzle.from_tuple(game()) == Puzzle.from_tuple(game())
+    assert len({Puzzle.from_tuple(game()), Puzzle.from_tuple(game())}) == 1
+
+def test_puzzle_pickle_1():
+    """Test description: pickled puzzle is restored with its groups"""
+    puzzle = Puzzle.from_tuple(game())
+    restored = pickle.loads(pickle.dumps(puzzle))
+    assert restored == puzzle
+    assert restored.cage_cells == puzzle.cage_cells
+    assert len(pickle.dumps(puzzle)) < len(pickle.dumps(game())) / 2
@@ -0,0 +1,149 @@
+"""This module reads and writes killer sudoku games in compact text and binary formats.
+
+Text format - one game per line with three fields separated by spaces:
+
+    <digits> <layout> <sums>
+
+digits: 81 characters, the value placed at each position or '.' if empty.
+layout: 81 characters, the group of each position as a character of LAYOUT_ALPHABET.
+sums: the sum of each group in the order of the layout, separated by commas.
+
+Groups are numbered in the order their first position appears, left to right and top to bottom.
+Lines which are empty or start with '#' are skipped.
+
+Binary format - the header MAGIC followed by one record per game:
+
+    41 bytes: the digits, two positions per byte (high nibble first)
+    81 bytes: the group of each position
+    n bytes: the sum of each group, where n is the number of groups in the layout
+
+Both formats store the borders as the layout of the groups, so only games whose borders agree
+with each other can be written. The sum of a group is read back at its first position.
+"""
+
+from typing import BinaryIO, Iterable, Iterator, TextIO
+import contextlib
+import os
+
+from puzzle import Puzzle
+from config import *
+
+
+LAYOUT_ALPHABET = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!#$%&()*+-/;<=>?@[]^_{|}~'
+MAGIC = b'KSP1'
+DIGIT_BYTES = (SUDOKU_SIZE ** 2 + 1) // 2
+
+
+# ========== single games ==========
+def check_layout(puzzle: Puzzle) -> None:
+    """Raises ValueError if the borders of the puzzle cannot be stored as a layout of groups."""
+    if Puzzle.from_layout(puzzle.digits, puzzle.cage_of, puzzle.cage_sums).borders != puzzle.borders:
+        raise ValueError('borders of neighbouring positions are inconsistent')
+
+
+def from_layout(digits: bytes, layout: bytes, cage_sums: bytes) -> Puzzle:
+    """Creates a puzzle from the fields of a record. Raises ValueError if the layout is invalid."""
+    if set(layout) != set(range(len(cage_sums))):
+        raise ValueError(f'layout has groups {sorted(set(layout))} but {len(cage_sums)} sums are given')
+    puzzle = Puzzle.from_layout(digits, layout, cage_sums)
+    if puzzle.cage_count != len(cage_sums):
+        raise ValueError('layout has a group whose positions are not connected')
+    return puzzle
+
+
+def format_line(puzzle: Puzzle) -> str:
+    """Returns the puzzle as a line of the text format, without the newline."""
+    check_layout(puzzle)
+    digits = ''.join(str(d) if d else '.' for d in puzzle.digits)
+    layout = ''.join(LAYOUT_ALPHABET[cage] for cage in puzzle.cage_of)
+    sums = ','.join(str(total) for total in puzzle.cage_sums)
+    return f'{digits} {layout} {sums}'
+
+
+def parse_line(line: str) -> Puzzle:
+    """Returns the puzzle stored in a line of the text format."""
+    fields = line.split()
+    if len(fields) != 3:
+        raise ValueError(f'expected 3 fields, got {len(fields)}')
+    digits, layout, sums = fields
+    if len(digits) != SUDOKU_SIZE ** 2 or len(layout) != SUDOKU_SIZE ** 2:
+        raise ValueError(f'expected {SUDOKU_SIZE ** 2} digits and groups, got {len(digits)} and {len(layout)}')
+    return from_layout(bytes(0 if x in '.0' else int(x) for x in digits),
+                       bytes(LAYOUT_ALPHABET.index(x) for x in layout),
+                       bytes(int(x) for x in sums.split(',')))
+
+
+def pack(puzzle: Puzzle) -> bytes:
+    """Returns the puzzle as a record of the binary format."""
+    check_layout(puzzle)
+    digits = puzzle.digits + bytes(2 * DIGIT_BYTES - len(puzzle.digits))
+    nibbles = bytes(digits[i] << 4 | digits[i + 1] for i in range(0, len(digits), 2))
+    return nibbles + puzzle.cage_of + puzzle.cage_sums
+
+
+def unpack(record: bytes) -> Puzzle:
+    """Returns the puzzle stored in a record of the binary format."""
+    digits = bytes(x for byte in record[:DIGIT_BYTES] for x in (byte >> 4, byte & 15))[:SUDOKU_SIZE ** 2]
+    layout = record[DIGIT_BYTES:DIGIT_BYTES + SUDOKU_SIZE ** 2]
+    return from_layout(digits, layout, record[DIGIT_BYTES + SUDOKU_SIZE ** 2:])
+
+
+# ========== streams of games ==========
+@contextlib.contextmanager
+def opened(file: str | os.PathLike | TextIO | BinaryIO, mode: str) -> Iterator[TextIO | BinaryIO]:
+    """Opens the file if a path is given, otherwise uses the file object as is."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, mode) as f:
+            yield f
+    else:
+        yield file
+
+
+def read_text(file: str | os.PathLike | TextIO) -> Iterator[Puzzle]:
+    """Yields the puzzles of a file in the text format, one line at a time."""
+    with opened(file, 'r') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                yield parse_line(line)
+            except ValueError as e:
+                raise ValueError(f'line {number}: {e}') from e
+
+
+def write_text(file: str | os.PathLike | TextIO, puzzles: Iterable[Puzzle]) -> int:
+    """Writes the puzzles to a file in the text format. Returns the number of puzzles written."""
+    count = 0
+    with opened(file, 'w') as f:
+        for puzzle in puzzles:
+            f.write(format_line(puzzle) + '\n')
+            count += 1
+    return count
+
+
+def read_binary(file: str | os.PathLike | BinaryIO) -> Iterator[Puzzle]:
+    """Yields the puzzles of a file in the binary format, one record at a time."""
+    with opened(file, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('not a killer sudoku binary file')
+        fixed = DIGIT_BYTES + SUDOKU_SIZE ** 2
+        while True:
+            record = f.read(fixed)
+            if not record:
+                return
+            if len(record) != fixed:
+                raise ValueError('truncated record')
+            sums = f.read(max(record[DIGIT_BYTES:]) + 1)
+            yield unpack(record + sums)
+
+
+def write_binary(file: str | os.PathLike | BinaryIO, puzzles: Iterable[Puzzle]) -> int:
+    """Writes the puzzles to a file in the binary format. Returns the number of puzzles written."""
+    count = 0
+    with opened(file, 'wb') as f:
+        f.write(MAGIC)
+        for puzzle in puzzles:
+            f.write(pack(puzzle))
+            count += 1
+    return count
@@ -0,0 +1,103 @@
+"""Usage: python -m pytest"""
+
+import io
+import pytest
+import serialization
+from puzzle import Puzzle
+from solver import FastKillerSudokuSolver
+from solver_2_test import solution
+from solver_3_test import game
+
+
+def anchored() -> tuple[list]:
+    """Returns the game with the sum of each group only shown at its first position."""
+    puzzle = Puzzle.from_tuple(game())
+    return Puzzle.from_layout(puzzle.digits, puzzle.cage_of, puzzle.cage_sums).to_tuple()
+
+# ========== text format ==========
+def test_text_1():
+    """Test description: line of the text format"""
+    line = serialization.format_line(Puzzle.from_tuple(game()))
+    digits, layout, sums_ = line.split(' ')
+    assert digits.startswith('...8.....2')
+    assert layout.startswith('0012345567')
+    assert sums_.startswith('10,9,15,3,26,12,1,')
+
+def test_text_2():
+    """Test description: round trip through the six arrays"""
+    data = anchored()
+    assert serialization.parse_line(serialization.format_line(Puzzle.from_tuple(data))).to_tuple() == data
+
+def test_text_3():
+    """Test description: parsed game has the same solution"""
+    puzzle = serialization.parse_line(serialization.format_line(Puzzle.from_tuple(game())))
+    assert FastKillerSudokuSolver.solve(*puzzle.to_tuple()) == solution
+
+def test_text_4():
+    """Test description: inconsistent borders cannot be written"""
+    data = game()
+    data[3][0][0] = False
+    with pytest.raises(ValueError):
+        serialization.format_line(Puzzle.from_tuple(data))
+
+def test_text_5():
+    """Test description: group whose positions are not connected"""
+    line = serialization.format_line(Puzzle.from_tuple(game()))
+    digits, layout, sums_ = line.split(' ')
+    layout = layout[:80] + '0'
+    with pytest.raises(ValueError):
+        serialization.parse_line(f'{digits} {layout} {sums_}')
+
+def test_text_6():
+    """Test description: streaming reader skips comments and reports the line of an error"""
+    line = serialization.format_line(Puzzle.from_tuple(game()))
+    file = io.StringIO(f'# games\n{line}\n\n{line}\nbad line\n')
+    reader = serialization.read_text(file)
+    assert next(reader) == next(reader)
+    with pytest.raises(ValueError, match='line 5'):
+        next(reader)
+
+def test_text_7():
+    """Test description: writer and reader"""
+    file = io.StringIO()
+    puzzles = [Puzzle.from_tuple(anchored())] * 3
+    assert serialization.write_text(file, puzzles) == 3
+    file.seek(0)
+    assert list(serialization.read_text(file)) == puzzles
+
+def test_text_8():
+    """Test description: group numbers with a gap"""
+    digits = '.' * 81
+    with pytest.raises(ValueError):
+        serialization.parse_line(f'{digits} {"0" * 80 + "5"} 40,5')
+    file = io.StringIO(f'{digits} {"0" * 80 + "5"} 40,5\n')
+    with pytest.raises(ValueError, match='line 1'):
+        next(serialization.read_text(file))
+
+# ========== binary format ==========
+def test_binary_1():
+    """Test description: round trip through a record"""
+    puzzle = Puzzle.from_tuple(anchored())
+    record = serialization.pack(puzzle)
+    assert len(record) == 41 + 81 + puzzle.cage_count
+    assert serialization.unpack(record) == puzzle
+
+def test_binary_2():
+    """Test description: writer and reader"""
+    file = io.BytesIO()
+    puzzles = [Puzzle.from_tuple(anchored())] * 3
+    assert serialization.write_binary(file, puzzles) == 3
+    file.seek(0)
+    assert list(serialization.read_binary(file)) == puzzles
+
+def test_binary_3():
+    """Test description: not a binary file"""
+    with pytest.raises(ValueError):
+        list(serialization.read_binary(io.BytesIO(b'nope')))
+
+def test_binary_4():
+    """Test description: truncated record"""
+    file = io.BytesIO()
+    serialization.write_binary(file, [Puzzle.from_tuple(game())])
+    with pytest.raises(ValueError):
+        list(serialization.read_binary(io.BytesIO(file.getvalue()[:-1])))
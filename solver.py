@@ -1,7 +1,18 @@
 from typing import Callable
+import time
+from cages import CAGE_COMBINATIONS, CAGE_TABLE, MAX_SUM, cage_index
+from dancing_links import DancingLinks
+from propagation import Propagator
 from config import *
 
 
+# lookup tables linking a position, pos = r * SUDOKU_SIZE + c, to its row, column and 3x3 box
+ROW_OF = tuple(pos // SUDOKU_SIZE for pos in range(SUDOKU_SIZE ** 2))
+COL_OF = tuple(pos % SUDOKU_SIZE for pos in range(SUDOKU_SIZE ** 2))
+BOX_OF = tuple((pos // SUDOKU_SIZE) // SUDOKU_BOX_SIZE * (SUDOKU_SIZE // SUDOKU_BOX_SIZE) + 
+               (pos % SUDOKU_SIZE) // SUDOKU_BOX_SIZE for pos in range(SUDOKU_SIZE ** 2))
+
+
 class SudokuSolver:
     @classmethod
     def solve(cls, board: list[list[str]]) -> list[list[list[str]]] | None:
@@ -525,5 +536,536 @@ class KillerSudokuSolver(SudokuSolver):
         # check if every box is in a group
         # and check if groups are disjoint
         return len(seen) == SUDOKU_SIZE ** 2 and len(seen) == len(set(seen))
+
+
+class BitmaskState:
+    """Bitmask representation of a killer sudoku game which is updated incrementally.
+    
+    The digit d is represented by the bit 1 << (d - 1). The digits used in every row, column, 
+    3x3 box and group are kept as integer masks, and each group keeps a running total and the 
+    number of positions that are still empty. Placing and removing a digit only touches the 
+    masks of the position, so no part of the board has to be rescanned during the search.
+    The digits allowed within a group are looked up in cages.CAGE_TABLE.
+    """
+    def __init__(
+            self: 'BitmaskState',
+            groups: list[list[int]], 
+            limits: dict[int: int], 
+            neighbors: dict[int: list[list[int, int]]]
+            ) -> None:
+        """Creates an empty board from the groups established by KillerSudokuSolver.group.
+        
+        Parameters
+        ----------
+        groups: list[list[int]]
+            A 2D array indicating the group number of a position.
+        limits: dict[int: int]
+            A dictionary linking each group number to the sum of the group.
+        neighbors: dict[int: list[list[int, int]]]
+            A dictionary linking each group number to the positions of all members in the group.
+        """
+        # groups are re-indexed from 0 so that they can be stored in lists
+        numbers = sorted(limits)
+        index = {number: k for k, number in enumerate(numbers)}
+
+        self.cells = [0] * SUDOKU_SIZE ** 2 # digit placed at each position, 0 if empty
+        self.rows = [0] * SUDOKU_SIZE
+        self.cols = [0] * SUDOKU_SIZE
+        self.boxes = [0] * SUDOKU_SIZE
+        self.cage_of = [index[groups[ROW_OF[pos]][COL_OF[pos]]] for pos in range(SUDOKU_SIZE ** 2)]
+        self.cage_cells = [[x * SUDOKU_SIZE + y for x, y in neighbors[number]] for number in numbers]
+        self.cage_limit = [limits[number] for number in numbers]
+        self.cage_used = [0] * len(numbers)
+        self.cage_total = [0] * len(numbers)
+        self.cage_free = [len(cells) for cells in self.cage_cells]
+        self.allowed = [ALL_DIGITS] * SUDOKU_SIZE ** 2 # digits not ruled out by Propagator
+        self.nodes = 0 # number of digits placed during the search
+        self.untried = [0] * SUDOKU_SIZE ** 2 # digits still to be tried at each depth of the search
+        self.trail = [0] * SUDOKU_SIZE ** 2 # digit placed at each depth of the search
+        self.deadline = None # time.perf_counter() value after which the search gives up
+        # position of the empty group in CAGE_TABLE, the digits used are added to it
+        self.cage_base = [cage_index(len(cells), limit) if len(cells) <= SUDOKU_SIZE and limit <= MAX_SUM else 0 
+                          for cells, limit in zip(self.cage_cells, self.cage_limit)]
+
+    def place(self: 'BitmaskState', pos: int, bit: int) -> None:
+        """Places the digit represented by bit at pos."""
+        digit = bit.bit_length()
+        cage = self.cage_of[pos]
+        self.cells[pos] = digit
+        self.rows[ROW_OF[pos]] |= bit
+        self.cols[COL_OF[pos]] |= bit
+        self.boxes[BOX_OF[pos]] |= bit
+        self.cage_used[cage] |= bit
+        self.cage_total[cage] += digit
+        self.cage_free[cage] -= 1
+
+    def remove(self: 'BitmaskState', pos: int, bit: int) -> None:
+        """Removes the digit represented by bit from pos. This undoes BitmaskState.place."""
+        digit = bit.bit_length()
+        cage = self.cage_of[pos]
+        self.cells[pos] = 0
+        self.rows[ROW_OF[pos]] ^= bit
+        self.cols[COL_OF[pos]] ^= bit
+        self.boxes[BOX_OF[pos]] ^= bit
+        self.cage_used[cage] ^= bit
+        self.cage_total[cage] -= digit
+        self.cage_free[cage] += 1
+
+    def candidates(self: 'BitmaskState', pos: int) -> int:
+        """Returns the mask of digits which can legally be placed at the empty position pos."""
+        cage = self.cage_of[pos]
+        return (~(self.rows[ROW_OF[pos]] | self.cols[COL_OF[pos]] | self.boxes[BOX_OF[pos]]) & self.allowed[pos] &
+                # digits which complete the group sum with the digits already placed
+                CAGE_TABLE[self.cage_base[cage] | self.cage_used[cage]])
+
+    def load(self: 'BitmaskState', board: list[list[str]]) -> bool:
+        """Places the values already on the board. 
+        
+        Returns
+        -------
+        validity: bool
+            Indicates if the values are consistent with the groups.
+        """
+        for pos in range(SUDOKU_SIZE ** 2):
+            value = board[ROW_OF[pos]][COL_OF[pos]]
+            if value == '':
+                continue
+            bit = 1 << (int(value) - 1)
+            if self.cage_used[self.cage_of[pos]] & bit:
+                # repeated digit within a group
+                return False
+            self.place(pos, bit)
         
+        # every group must still be able to reach its sum
+        for cage, limit in enumerate(self.cage_limit):
+            total, free = self.cage_total[cage], self.cage_free[cage]
+            allowed = CAGE_TABLE[self.cage_base[cage] | self.cage_used[cage]]
+            if (free == 0 and total != limit) or (free > 0 and allowed == 0):
+                return False
+        return True
+
+    def dump(self: 'BitmaskState', board: list[list[str]]) -> list[list[str]]:
+        """Writes the placed digits onto the board."""
+        for pos, digit in enumerate(self.cells):
+            if digit:
+                board[ROW_OF[pos]][COL_OF[pos]] = str(digit)
+        return board
+
+
+class Ordering:
+    """Strategies to choose the empty position which is filled in next.
+    
+    Each strategy receives the bitmask representation of the game and the empty positions,
+    and returns the index, k <= index < len(empty), of the position to fill in next.
+    """
+    @staticmethod
+    def row_major(state: BitmaskState, empty: list[int], k: int) -> int:
+        """Fills in the positions from left to right, top to bottom."""
+        return k
+
+    @staticmethod
+    def mrv(state: BitmaskState, empty: list[int], k: int) -> int:
+        """Fills in the position with the minimum remaining values first."""
+        best, fewest = k, SUDOKU_SIZE + 1
+        for i in range(k, len(empty)):
+            count = state.candidates(empty[i]).bit_count()
+            if count < fewest:
+                best, fewest = i, count
+                if count <= 1:
+                    # cannot do better than a forced or impossible position
+                    break
+        return best
+
+    @staticmethod
+    def mrv_cage(state: BitmaskState, empty: list[int], k: int) -> int:
+        """Fills in the position with the minimum remaining values first. 
+        Ties are broken by the group with the fewest digits and positions left."""
+        best, fewest = k, (SUDOKU_SIZE + 1, 0, 0)
+        for i in range(k, len(empty)):
+            pos = empty[i]
+            count = state.candidates(pos).bit_count()
+            if count > fewest[0]:
+                continue
+            cage = state.cage_of[pos]
+            key = (count, 
+                   CAGE_TABLE[state.cage_base[cage] | state.cage_used[cage]].bit_count(), 
+                   state.cage_free[cage])
+            if key < fewest:
+                best, fewest = i, key
+                if count <= 1:
+                    break
+        return best
+
+
+ORDERINGS = {'row-major': Ordering.row_major, 'mrv': Ordering.mrv, 'mrv-cage': Ordering.mrv_cage}
+
+
+class FastKillerSudokuSolver(KillerSudokuSolver):
+    @classmethod
+    def solve(
+            cls,
+            board: list[list[str]], 
+            sums: list[list[int]], 
+            top_border: list[list[bool]], 
+            bottom_border: list[list[bool]], 
+            left_border: list[list[bool]], 
+            right_border: list[list[bool]],
+            ordering: str | Callable = 'mrv-cage',
+            propagation: bool = True,
+            stats: dict | None = None,
+            timeout: float | None = None
+            ) -> list[list[list[str]]] | None:
+        """Solves a killer sudoku game using the bitmask representation of the board.
+
+        Unlike KillerSudokuSolver.solve, digits may not repeat within a group.
+        
+        Parameters
+        ----------
+        board: list[list[str]]
+            A 2D array containing the values placed onto the board.
+        sums: list[list[int]]
+            The sum limit for each box on the board.
+        top_border: list[list[bool]]
+            A 2D array indicating the presence of a border on the top.
+        bottom_border: list[list[bool]]
+            A 2D array indicating the presence of a border on the bottom.
+        left_border: list[list[bool]]
+            A 2D array indicating the presence of a border on the left.
+        right_border: list[list[bool]]
+            A 2D array indicating the presence of a border on the right.
+        ordering: str | Callable
+            The name of a strategy in ORDERINGS, or a callable with the same signature, 
+            used to choose the empty position which is filled in next.
+        propagation: bool
+            Indicates if Propagator should fill in the forced digits before the search.
+        stats: dict | None
+            If given, the number of digits placed during the search is recorded under 'nodes',
+            and the number of empty positions left after propagation under 'empty'.
+        timeout: float | None
+            If given, the number of seconds after which the search raises TimeoutError.
+
+        Returns
+        -------
+        board: list[list[str]]
+            A 2D array containing the values placed onto the board. It has no empty spots.
+        If None is returned, the game parameters are invalid or it has no solution.
+        """
+        order = ORDERINGS[ordering] if isinstance(ordering, str) else ordering
+        state = cls.prepare(board, sums, top_border, bottom_border, left_border, right_border)
+        if state is None:
+            # invalid board arragement or groups
+            return None
+        if timeout is not None:
+            state.deadline = time.perf_counter() + timeout
+        
+        if propagation and not Propagator.reduce(state, Propagator.sum_groups(state)):
+            # contradiction found without any search
+            return None
+
+        # solve the game
+        empty = [pos for pos in range(SUDOKU_SIZE ** 2) if state.cells[pos] == 0]
+        if stats is not None:
+            stats['empty'] = len(empty)
+        count = cls.search(state, empty, order)
+        if stats is not None:
+            stats['nodes'] = state.nodes
+        if count == 0:
+            return None
+        return state.dump(board)
+
+    @classmethod
+    def propagate(
+            cls,
+            board: list[list[str]], 
+            sums: list[list[int]], 
+            top_border: list[list[bool]], 
+            bottom_border: list[list[bool]], 
+            left_border: list[list[bool]], 
+            right_border: list[list[bool]]
+            ) -> tuple[list[list[str]], list[list[list[str]]]] | None:
+        """Fills in the digits forced by Propagator without searching. The arrays passed in are not modified.
+        
+        Returns
+        -------
+        board: list[list[str]]
+            A 2D array containing the values placed onto the board, including the forced digits.
+        candidates: list[list[list[str]]]
+            A 2D array containing the digits which are still allowed at each position.
+        If None is returned, the game parameters are invalid or it has no solution.
+        """
+        board = [row.copy() for row in board]
+        sums = [row.copy() for row in sums] # KillerSudokuSolver.group fills in the sums
+        state = cls.prepare(board, sums, top_border, bottom_border, left_border, right_border)
+        if state is None or not Propagator.reduce(state, Propagator.sum_groups(state)):
+            return None
+        
+        candidates = [[[] for _ in range(SUDOKU_SIZE)] for _ in range(SUDOKU_SIZE)]
+        for pos in range(SUDOKU_SIZE ** 2):
+            mask = 1 << (state.cells[pos] - 1) if state.cells[pos] else state.candidates(pos)
+            candidates[ROW_OF[pos]][COL_OF[pos]] = [action for d, action in enumerate(ACTIONS) if mask >> d & 1]
+        return state.dump(board), candidates
+
+    @classmethod
+    def count_solutions(
+            cls,
+            board: list[list[str]], 
+            sums: list[list[int]], 
+            top_border: list[list[bool]], 
+            bottom_border: list[list[bool]], 
+            left_border: list[list[bool]], 
+            right_border: list[list[bool]],
+            limit: int = 2
+            ) -> int:
+        """Counts the solutions of a killer sudoku game, stopping once limit solutions are found.
+        The arrays passed in are not modified.
+
+        Parameters
+        ----------
+        limit: int
+            The maximum number of solutions to count. It must be at least 1.
+
+        Returns
+        -------
+        count: int
+            The number of solutions, at most limit. It is 0 if the game parameters are invalid.
+        """
+        if limit < 1:
+            raise ValueError(f'limit must be at least 1, got {limit}')
+        board = [row.copy() for row in board]
+        sums = [row.copy() for row in sums] # KillerSudokuSolver.group fills in the sums
+        state = cls.prepare(board, sums, top_border, bottom_border, left_border, right_border)
+        if state is None or not Propagator.reduce(state, Propagator.sum_groups(state)):
+            return 0
+        
+        empty = [pos for pos in range(SUDOKU_SIZE ** 2) if state.cells[pos] == 0]
+        return cls.search(state, empty, ORDERINGS['mrv-cage'], limit)
+
+    @classmethod
+    def is_unique(
+            cls,
+            board: list[list[str]], 
+            sums: list[list[int]], 
+            top_border: list[list[bool]], 
+            bottom_border: list[list[bool]], 
+            left_border: list[list[bool]], 
+            right_border: list[list[bool]]
+            ) -> bool:
+        """Checks if a killer sudoku game has exactly one solution. The arrays passed in are not modified."""
+        return cls.count_solutions(board, sums, top_border, bottom_border, left_border, right_border, limit=2) == 1
+
+    @classmethod
+    def prepare(
+            cls,
+            board: list[list[str]], 
+            sums: list[list[int]], 
+            top_border: list[list[bool]], 
+            bottom_border: list[list[bool]], 
+            left_border: list[list[bool]], 
+            right_border: list[list[bool]]
+            ) -> BitmaskState | None:
+        """Validates the parameters of the game and builds its bitmask representation.
+        
+        Returns
+        -------
+        state: BitmaskState
+            The bitmask representation of the game with the values on the board placed.
+        If None is returned, the game parameters are invalid.
+        """
+        if not cls.validate_sudoku_board(board):
+            return None
+        
+        result = cls.group(sums, top_border, bottom_border, left_border, right_border)
+        if result is None:
+            return None
+        
+        state = BitmaskState(*result)
+        if not state.load(board):
+            return None
+        return state
+
+    @classmethod
+    def search(cls, state: BitmaskState, empty: list[int], order: Callable = Ordering.row_major, limit: int = 1) -> int:
+        """Try digits at the empty positions to find solutions to the game.
+
+        The search keeps an explicit stack instead of recursing. The digits still to be tried and 
+        the digit placed at each depth are kept in BitmaskState.untried and BitmaskState.trail,
+        so no memory is allocated while searching and the depth is not bound by the recursion limit.
+        
+        Parameters
+        ----------
+        state: BitmaskState
+            The bitmask representation of the game.
+        empty: list[int]
+            The empty positions. They are reordered into the order in which they are filled in.
+        order: Callable
+            The strategy used to choose the empty position which is filled in next.
+        limit: int
+            The search stops once this many solutions have been found. It must be at least 1.
+
+        Returns
+        -------
+        count: int
+            The number of solutions found, at most limit. If it is limit, the last solution 
+            found is left on the board, otherwise the board is left unchanged.
+        """
+        if limit < 1:
+            raise ValueError(f'limit must be at least 1, got {limit}')
+        n = len(empty)
+        if n == 0:
+            return 1
+        untried, trail = state.untried, state.trail
+
+        # move the chosen position to the front of the unfilled positions
+        i = order(state, empty, 0)
+        empty[0], empty[i] = empty[i], empty[0]
+        untried[0], trail[0] = state.candidates(empty[0]), 0
+        k, count = 0, 0
+        while True:
+            pos = empty[k]
+            if trail[k]:
+                # undo the digit tried previously at this depth
+                state.remove(pos, trail[k])
+                trail[k] = 0
+            mask = untried[k]
+            if mask == 0:
+                # backtrack
+                if k == 0:
+                    return count
+                k -= 1
+                continue
+
+            bit = mask & -mask # lowest digit remaining
+            untried[k] = mask ^ bit
+            trail[k] = bit
+            state.place(pos, bit)
+            state.nodes += 1
+            if state.deadline is not None and state.nodes & 1023 == 0 and time.perf_counter() > state.deadline:
+                raise TimeoutError(f'no solution found within {state.nodes} digits placed')
+
+            k += 1
+            if k == n:
+                count += 1
+                if count == limit:
+                    return count
+                # keep searching from the last position filled in
+                k -= 1
+                continue
+            i = order(state, empty, k)
+            empty[k], empty[i] = empty[i], empty[k]
+            untried[k], trail[k] = state.candidates(empty[k]), 0
+
+
+class DancingLinksSolver(FastKillerSudokuSolver):
+    @classmethod
+    def solve(
+            cls,
+            board: list[list[str]], 
+            sums: list[list[int]], 
+            top_border: list[list[bool]], 
+            bottom_border: list[list[bool]], 
+            left_border: list[list[bool]], 
+            right_border: list[list[bool]],
+            stats: dict | None = None,
+            timeout: float | None = None
+            ) -> list[list[list[str]]] | None:
+        """Solves a killer sudoku game as an exact cover problem with dancing links.
+
+        Digits may not repeat within a group.
+        
+        Parameters
+        ----------
+        board: list[list[str]]
+            A 2D array containing the values placed onto the board.
+        sums: list[list[int]]
+            The sum limit for each box on the board.
+        top_border: list[list[bool]]
+            A 2D array indicating the presence of a border on the top.
+        bottom_border: list[list[bool]]
+            A 2D array indicating the presence of a border on the bottom.
+        left_border: list[list[bool]]
+            A 2D array indicating the presence of a border on the left.
+        right_border: list[list[bool]]
+            A 2D array indicating the presence of a border on the right.
+        stats: dict | None
+            If given, the number of rows chosen during the search is recorded under 'nodes'.
+        timeout: float | None
+            If given, the number of seconds after which the search raises TimeoutError.
+
+        Returns
+        -------
+        board: list[list[str]]
+            A 2D array containing the values placed onto the board. It has no empty spots.
+        If None is returned, the game parameters are invalid or it has no solution.
+        """
+        state = cls.prepare(board, sums, top_border, bottom_border, left_border, right_border)
+        if state is None:
+            # invalid board arragement or groups
+            return None
+        
+        # solve the game
+        matrix = cls.build_matrix(state)
+        if timeout is not None:
+            matrix.deadline = time.perf_counter() + timeout
+        solution = next(matrix.search(), None)
+        if stats is not None:
+            stats['nodes'] = matrix.nodes
+        if solution is None:
+            return None
+        for pos, bit in solution:
+            if pos >= 0 and not state.cells[pos]:
+                state.place(pos, bit)
+        return state.dump(board)
+
+    @classmethod
+    def build_matrix(cls, state: BitmaskState) -> DancingLinks:
+        """Encodes the game as an exact cover problem.
+
+        Every position, every digit of a row, column and 3x3 box, and every group is a column which
+        has to be covered exactly once. Each group also has a column for each digit, which is covered
+        either by the position of the group holding that digit or by the combination chosen for the 
+        group when the digit is not part of it.
+        
+        Parameters
+        ----------
+        state: BitmaskState
+            The bitmask representation of the game with the values on the board placed.
+
+        Returns
+        -------
+        matrix: DancingLinks
+            The exact cover matrix. Rows placing a digit are labelled (pos, bit) and rows choosing 
+            the combination of digits of a group are labelled (-1 - group, combination).
+        """
+        cells = SUDOKU_SIZE ** 2
+        cages = len(state.cage_cells)
+        matrix = DancingLinks(4 * cells + cages * (SUDOKU_SIZE + 1))
+        
+        # columns of each kind of constraint
+        row_digit, col_digit, box_digit = cells, 2 * cells, 3 * cells
+        cage_chosen = 4 * cells
+        cage_digit = 4 * cells + cages
+
+        for pos in range(cells):
+            cage = state.cage_of[pos]
+            mask = 1 << (state.cells[pos] - 1) if state.cells[pos] else state.candidates(pos)
+            for d in range(SUDOKU_SIZE):
+                if mask >> d & 1:
+                    matrix.add_row([pos, 
+                                    row_digit + ROW_OF[pos] * SUDOKU_SIZE + d, 
+                                    col_digit + COL_OF[pos] * SUDOKU_SIZE + d, 
+                                    box_digit + BOX_OF[pos] * SUDOKU_SIZE + d, 
+                                    cage_digit + cage * SUDOKU_SIZE + d], (pos, 1 << d))
+        
+        for cage, (positions, limit) in enumerate(zip(state.cage_cells, state.cage_limit)):
+            used = state.cage_used[cage]
+            for combination in CAGE_COMBINATIONS.get((len(positions), limit), ()):
+                if combination & used != used:
+                    continue
+                matrix.add_row([cage_chosen + cage] + 
+                               [cage_digit + cage * SUDOKU_SIZE + d for d in range(SUDOKU_SIZE) if not combination >> d & 1], 
+                               (-1 - cage, combination))
+        return matrix
+
 
+# solvers sharing the signature of KillerSudokuSolver.solve
+SOLVERS = {'backtracking': KillerSudokuSolver, 'bitmask': FastKillerSudokuSolver, 'dlx': DancingLinksSolver}
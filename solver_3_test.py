@@ -0,0 +1,197 @@
+"""Usage: python -m pytest"""
+
+import copy
+import inspect
+import pytest
+import sys
+from solver import KillerSudokuSolver, FastKillerSudokuSolver, BitmaskState, Ordering, ORDERINGS
+from solver_2_test import board, sums, top_border, bottom_border, left_border, right_border, groups, limits, neighbors, solution
+
+
+def game() -> tuple[list]:
+    """Returns a fresh copy of the killer sudoku game used for testing."""
+    return copy.deepcopy((board, sums, top_border, bottom_border, left_border, right_border))
+
+# ========== BitmaskState ==========
+def test_bitmask_state_1():
+    """Test description: empty group of size 1 only allows its sum"""
+    state = BitmaskState(groups, limits, neighbors)
+    assert state.candidates(8) == 1 << 0
+
+def test_bitmask_state_2():
+    """Test description: digits already used in the row, column and box are removed"""
+    state = BitmaskState(groups, limits, neighbors)
+    assert state.load(board) == True
+    assert state.candidates(1) & (1 << 7) == 0 # 8 in row 0
+    assert state.candidates(1) & (1 << 6) == 0 # 7 in column 1
+    assert state.candidates(1) & (1 << 1) == 0 # 2 in the top left box
+
+def test_bitmask_state_3():
+    """Test description: remove undoes place"""
+    state = BitmaskState(groups, limits, neighbors)
+    before = state.candidates(0), state.candidates(1), state.candidates(10)
+    state.place(0, 1 << 3)
+    assert state.candidates(1) == 1 << 5 # group of 10 has to be completed with a 6
+    state.remove(0, 1 << 3)
+    assert (state.candidates(0), state.candidates(1), state.candidates(10)) == before
+
+def test_bitmask_state_4():
+    """Test description: repeated digit within a group"""
+    state = BitmaskState(groups, limits, neighbors)
+    temp = copy.deepcopy(board)
+    temp[5][4], temp[5][5] = '2', '2'
+    assert state.load(temp) == False
+
+def test_bitmask_state_5():
+    """Test description: digits on board exceed the group sum"""
+    state = BitmaskState(groups, limits, neighbors)
+    temp = copy.deepcopy(board)
+    temp[0][0] = '9'
+    temp[0][1] = '3'
+    assert state.load(temp) == False
+
+# ========== solve() ==========
+def test_fast_solver_1():
+    """Test description: valid board with solution"""
+    assert FastKillerSudokuSolver.solve(*game()) == solution
+
+def test_fast_solver_2():
+    """Test description: same solution as the KillerSudokuSolver"""
+    assert FastKillerSudokuSolver.solve(*game()) == KillerSudokuSolver.solve(*game())
+
+def test_fast_solver_3():
+    """Test description: invalid board without solution"""
+    data = game()
+    data[0][0][0] = '1'
+    assert FastKillerSudokuSolver.solve(*data) == None
+
+def test_fast_solver_4():
+    """Test description: inconsistent borders"""
+    data = game()
+    data[2][0][0] = False
+    assert FastKillerSudokuSolver.solve(*data) == None
+
+def test_fast_solver_5():
+    """Test description: the board is filled in place"""
+    data = game()
+    assert FastKillerSudokuSolver.solve(*data) is data[0]
+
+# ========== orderings ==========
+@pytest.mark.parametrize('ordering', list(ORDERINGS))
+def test_ordering_1(ordering):
+    """Test description: every strategy finds the solution"""
+    assert FastKillerSudokuSolver.solve(*game(), ordering=ordering, propagation=False) == solution
+
+def test_ordering_2():
+    """Test description: number of digits placed is recorded"""
+    stats = {}
+    FastKillerSudokuSolver.solve(*game(), ordering='row-major', propagation=False, stats=stats)
+    assert stats['nodes'] >= sum(row.count('') for row in board)
+
+def test_ordering_3():
+    """Test description: minimum remaining values places fewer digits than row-major order"""
+    row_major, mrv = {}, {}
+    FastKillerSudokuSolver.solve(*game(), ordering='row-major', propagation=False, stats=row_major)
+    FastKillerSudokuSolver.solve(*game(), ordering='mrv', propagation=False, stats=mrv)
+    assert mrv['nodes'] < row_major['nodes']
+
+def test_ordering_4():
+    """Test description: custom strategy"""
+    calls = []
+    def order(state, empty, k):
+        calls.append(k)
+        return Ordering.mrv(state, empty, k)
+    assert FastKillerSudokuSolver.solve(*game(), ordering=order, propagation=False) == solution
+    assert len(calls) > 0
+
+def test_ordering_5():
+    """Test description: minimum remaining values picks a forced position"""
+    state = BitmaskState(groups, limits, neighbors)
+    empty = list(range(81))
+    assert empty[Ordering.mrv(state, empty, 0)] == 2 # group of 1 summing to 9
+
+def test_ordering_6():
+    """Test description: unknown strategy"""
+    with pytest.raises(KeyError):
+        FastKillerSudokuSolver.solve(*game(), ordering='unknown')
+
+# ========== search() ==========
+def test_search_1():
+    """Test description: search does not recurse"""
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(inspect.stack()) + 30)
+    try:
+        result = FastKillerSudokuSolver.solve(*game(), ordering='row-major', propagation=False)
+    finally:
+        sys.setrecursionlimit(limit)
+    assert result == solution
+
+def test_search_2():
+    """Test description: empty positions are reordered into the order they are filled in"""
+    state = BitmaskState(groups, limits, neighbors)
+    state.load(board)
+    empty = [pos for pos in range(81) if state.cells[pos] == 0]
+    assert FastKillerSudokuSolver.search(state, empty, Ordering.mrv) == 1
+    assert sorted(empty) == [pos for pos in range(81) if board[pos // 9][pos % 9] == '']
+    assert [state.cells[pos] for pos in range(81)] == [int(x) for row in solution for x in row]
+
+def test_search_3():
+    """Test description: search without a solution leaves the board unchanged"""
+    state = BitmaskState(groups, limits, neighbors)
+    temp = copy.deepcopy(board)
+    temp[0][0] = '1' # the group of 1 summing to 1 cannot be filled in
+    state.load(temp)
+    cells = state.cells.copy()
+    empty = [pos for pos in range(81) if state.cells[pos] == 0]
+    assert FastKillerSudokuSolver.search(state, empty, Ordering.mrv) == 0
+    assert state.cells == cells
+
+# ========== count_solutions() ==========
+def test_count_solutions_1():
+    """Test description: game with a unique solution"""
+    assert FastKillerSudokuSolver.count_solutions(*game()) == 1
+    assert FastKillerSudokuSolver.is_unique(*game()) == True
+
+def test_count_solutions_2():
+    """Test description: game with many solutions stops at the limit"""
+    data = list(game())
+    data[0] = [[''] * 9 for _ in range(9)]
+    # every 3x3 box is a group summing to 45
+    data[1] = [[45 if i % 3 == 0 and j % 3 == 0 else 0 for j in range(9)] for i in range(9)]
+    data[2] = [[i % 3 == 0 for j in range(9)] for i in range(9)]
+    data[3] = [[i % 3 == 2 for j in range(9)] for i in range(9)]
+    data[4] = [[j % 3 == 0 for j in range(9)] for i in range(9)]
+    data[5] = [[j % 3 == 2 for j in range(9)] for i in range(9)]
+    assert FastKillerSudokuSolver.count_solutions(*data, limit=5) == 5
+    assert FastKillerSudokuSolver.is_unique(*data) == False
+
+def test_count_solutions_3():
+    """Test description: game without a solution"""
+    data = game()
+    data[0][0][0] = '1'
+    assert FastKillerSudokuSolver.count_solutions(*data) == 0
+    assert FastKillerSudokuSolver.is_unique(*data) == False
+
+def test_count_solutions_4():
+    """Test description: arrays passed in are not modified"""
+    data = game()
+    FastKillerSudokuSolver.count_solutions(*data)
+    assert data == game()
+
+def test_count_solutions_5():
+    """Test description: search continues after a solution is found"""
+    state = BitmaskState(groups, limits, neighbors)
+    state.load(solution)
+    state.remove(0, 1 << 3)
+    state.remove(1, 1 << 5)
+    empty = [0, 1]
+    assert FastKillerSudokuSolver.search(state, empty, Ordering.row_major, limit=2) == 1
+    assert state.cells[0] == 0 and state.cells[1] == 0
+
+def test_count_solutions_6():
+    """Test description: limit below one"""
+    for limit in (0, -1):
+        with pytest.raises(ValueError):
+            FastKillerSudokuSolver.count_solutions(*game(), limit=limit)
+        with pytest.raises(ValueError):
+            FastKillerSudokuSolver.search(BitmaskState(groups, limits, neighbors), [], limit=limit)
@@ -0,0 +1,167 @@
+"""This module plays game after game on screen: it keeps the models loaded, polls the board and only
+reads it again when it changes to a new game, which is then solved and entered automatically."""
+
+from typing import Callable
+import threading
+import time
+import numpy as np
+import skimage
+
+from detection import IncrementalDetection
+from locator import BoardLocator
+from inputs import InputBackend, input_backend
+from solver import SOLVERS
+import prediction
+import batch
+
+from config import *
+
+
+def capture_screen(region: tuple[int, int, int, int] | None = None) -> np.ndarray:
+    """Returns the RGB pixels of the screen, or of the region given as left, top, width and height."""
+    import pyautogui
+    return np.asarray(pyautogui.screenshot(region=region))
+
+
+class Watcher:
+    """Polls the screen and plays every new game shown.
+
+    Each poll captures only the region of the board, once it has been found, and compares a small
+    thumbnail of it with that of the board last read. The board is only read again when the
+    thumbnail has changed and then stayed the same for one poll, so that frames in the middle of
+    an animation are not read. A board whose groups and sums are those of the last game is the
+    same game, with digits entered or a box highlighted, and is not solved again. Boards are read
+    with IncrementalDetection, so only the boxes which changed since the last read are inferred.
+    """
+    statuses = ('no board', 'unchanged', 'settling', 'same game', 'solved', 'unsolvable', 'timeout', 'error')
+
+    def __init__(
+            self: 'Watcher',
+            capture: Callable[[tuple[int, int, int, int] | None], np.ndarray] = capture_screen,
+            backend: InputBackend | str | None = None,
+            pause: float = 0.01,
+            solver: str = 'bitmask',
+            timeout: float | None = None,
+            order: str = 'serpentine',
+            navigation: str = 'auto',
+            tolerance: float = 16.0,
+            locator: BoardLocator | None = None
+            ) -> None:
+        """Creates a watcher which has not seen any board yet.
+
+        Parameters
+        ----------
+        capture: Callable[[tuple[int, int, int, int] | None], np.ndarray]
+            Returns the pixels of the screen, or of the region given as left, top, width and height.
+        backend: InputBackend | str | None
+            The backend entering the solutions, or its name in inputs.INPUT_BACKENDS.
+        pause: float
+            The number of seconds to wait after every input event, if the backend is created from its name.
+        solver: str
+            The name of the solver in solver.SOLVERS.
+        timeout: float | None
+            The number of seconds allowed for solving a game.
+        order: str
+            The order the positions are entered in. See InputScheduler.moves.
+        navigation: str
+            How to move between positions. See InputScheduler.events.
+        tolerance: float
+            The difference of gray levels, between 0 and 255, above which a block of a thumbnail has changed.
+        locator: BoardLocator | None
+            The locator finding the board on screen. If None, a new one is used.
+        """
+        if solver not in SOLVERS:
+            raise ValueError(f'unknown solver {solver!r}, expected one of {list(SOLVERS)}')
+        self.capture = capture
+        self.backend = backend if isinstance(backend, InputBackend) else input_backend(backend, pause)
+        self.solver = solver
+        self.timeout = timeout
+        self.order = order
+        self.navigation = navigation
+        self.tolerance = tolerance
+        self.locator = BoardLocator() if locator is None else locator
+        self.region = None # region of the board on screen, as top, left, bottom and right edges
+        self.last = None # thumbnail of the board last read
+        self.pending = None # thumbnail of the last poll, while the board settles
+        self.game = None # groups and sums of the last game
+        self.detection = IncrementalDetection()
+        self.stats = {status: 0 for status in self.statuses}
+        self.stats['detections'] = 0
+
+    @staticmethod
+    def thumbnail(board: np.ndarray, size: int = 4) -> np.ndarray:
+        """Returns the gray levels of the board, between 0 and 255, averaged over size x size blocks of every box."""
+        gray = BoardLocator.grayscale(board) * 255
+        side = SUDOKU_SIZE * size
+        return skimage.transform.resize(gray, (side, side), anti_aliasing=True, preserve_range=True)
+
+    def changed(self: 'Watcher', a: np.ndarray | None, b: np.ndarray | None) -> bool:
+        """Returns whether any block of two thumbnails differs by more than the tolerance, so that a
+        single digit entered is a change."""
+        return a is None or b is None or np.abs(a - b).max() > self.tolerance
+
+    def grab(self: 'Watcher') -> np.ndarray | None:
+        """Returns the pixels of the board, or None if it is not on screen. Only the region of the
+        board is captured while its frame is still there."""
+        if self.region is not None:
+            top, left, bottom, right = self.region
+            board = self.capture((left, top, right - left, bottom - top))
+            if self.locator.verify(board, (0, 0, bottom - top, right - left)):
+                return board
+        screen = self.capture(None)
+        self.region = self.locator.locate(screen)
+        if self.region is None:
+            return None
+        top, left, bottom, right = self.region
+        return screen[top:bottom, left:right]
+
+    def poll(self: 'Watcher') -> str:
+        """Looks at the screen once, and plays the game shown if it is a new one. Returns one of
+        Watcher.statuses, which is also counted in Watcher.stats with the statistics of the reads.
+        See IncrementalDetection.scan."""
+        status = self.step()
+        self.stats[status] += 1
+        return status
+
+    def step(self: 'Watcher') -> str:
+        board = self.grab()
+        if board is None:
+            return 'no board'
+        thumbnail = self.thumbnail(board)
+        if not self.changed(thumbnail, self.last):
+            self.pending = None
+            return 'unchanged'
+        if self.changed(thumbnail, self.pending):
+            self.pending = thumbnail
+            return 'settling'
+        self.last, self.pending = thumbnail, None
+
+        data = self.detection.process_board(board, self.stats)
+        self.stats['detections'] += 1
+        if list(data[1:]) == self.game:
+            return 'same game'
+        self.game = list(data[1:])
+        result = batch.solve_one((0, data, self.solver, self.timeout))
+        if result.status == 'solved':
+            self.enter(data, result.solution)
+        return result.status
+
+    def enter(self: 'Watcher', data: tuple[list], solution: list[list[str]]) -> None:
+        """Enters the solution of the board read in the region of the board."""
+        from interaction import Controller
+        context = {'data': data}
+        BoardLocator.update(context, self.region)
+        context['box centers'] = Controller.calculate_box_centers(context)
+        Controller.implement_solution(context, solution, self.backend, self.order, self.navigation)
+
+    def run(self: 'Watcher', interval: float = 0.5, games: int | None = None, stop: threading.Event | None = None) -> dict[str, int]:
+        """Polls the screen every interval seconds until games games have been solved, or until stop
+        is set. The models are loaded first, so that the first game is read as fast as the others.
+        Returns Watcher.stats."""
+        prediction.Predictor.warm_up()
+        stop = threading.Event() if stop is None else stop
+        while not stop.is_set() and (games is None or self.stats['solved'] < games):
+            start = time.perf_counter()
+            self.poll()
+            stop.wait(max(0, interval - (time.perf_counter() - start)))
+        return self.stats
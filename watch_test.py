@@ -0,0 +1,73 @@
+"""Usage: python -m pytest"""
+
+import numpy as np
+import pytest
+import prediction
+import watch
+from inputs import RecordingInput
+from watch import Watcher
+from ingest_test import window
+from solver_2_test import board, sums, top_border, bottom_border, left_border, right_border, solution
+
+
+class Screen:
+    """A fake screen showing one image, which records the regions captured."""
+    def __init__(self, image: np.ndarray) -> None:
+        self.image = image
+        self.regions = []
+
+    def __call__(self, region):
+        self.regions.append(region)
+        if region is None:
+            return self.image
+        left, top, width, height = region
+        return self.image[top:top + height, left:left + width]
+
+
+@pytest.fixture
+def game(monkeypatch):
+    """Reads every board as the game of solver_2_test."""
+    data = (board, sums, top_border, bottom_border, left_border, right_border)
+    monkeypatch.setattr(watch.IncrementalDetection, 'process_board', lambda self, screen, stats: [[list(row) for row in array] for array in data])
+    monkeypatch.setattr(prediction.Predictor, 'backend', 'numpy')
+
+# ========== poll() ==========
+def test_poll_1(game):
+    """Test description: a new game is solved and entered once"""
+    screen = Screen(window())
+    watcher = Watcher(screen, RecordingInput(pause=0))
+    assert [watcher.poll() for _ in range(3)] == ['settling', 'solved', 'unchanged']
+    digits = [key for event in watcher.backend.events if event.kind == 'keys' for key in event.value if key.isdigit()]
+    assert len(digits) == sum(value == '' for row in board for value in row)
+    assert watcher.backend.events[0].value == (120 + 452 // 18, 80 + 452 // 18)
+
+    # digits entered change the board, but not the game
+    screen.image = window()
+    screen.image[150:170, 200:210] = 20
+    assert [watcher.poll() for _ in range(3)] == ['settling', 'same game', 'unchanged']
+    assert watcher.stats['detections'] == 2 and watcher.stats['solved'] == 1
+
+def test_poll_2(game):
+    """Test description: only the region of the board is captured once it is found"""
+    screen = Screen(np.full((300, 300, 3), 230, dtype=np.uint8))
+    watcher = Watcher(screen, RecordingInput(pause=0))
+    assert watcher.poll() == 'no board'
+    screen.image = window()
+    watcher.poll(), watcher.poll(), watcher.poll()
+    assert screen.regions == [None, None, (120, 80, 452, 452), (120, 80, 452, 452)]
+
+    # the board moved, so the screen is searched again
+    screen.image = window(top=120, left=60)
+    watcher.poll()
+    assert screen.regions[-2:] == [(120, 80, 452, 452), None] and watcher.region == (120, 60, 572, 512)
+
+def test_poll_3():
+    """Test description: unknown solver"""
+    with pytest.raises(ValueError):
+        Watcher(Screen(window()), 'recorder', solver='random')
+
+# ========== run() ==========
+def test_run_1(game):
+    """Test description: polls until a game is solved"""
+    stats = Watcher(Screen(window()), RecordingInput(pause=0)).run(interval=0, games=1)
+    assert (stats['settling'], stats['solved'], stats['detections']) == (1, 1, 1)